@@ -0,0 +1,91 @@
+"""
+Checkpoint files for batch scraper runs.
+========================================
+A run directory holds two append-only JSONL files:
+
+    leads.jsonl    one line per lead, flushed to disk as soon as it is found
+    journal.jsonl  one line per finished job (keyword, area, max_results)
+
+If Chrome crashes or the machine reboots, restarting the same batch reads
+the journal, skips finished jobs and continues. Leads of a job that was
+interrupted half-way are already on disk and are not written twice when
+the job is re-run.
+"""
+
+import os
+import json
+import time
+
+LEADS_FILE = "leads.jsonl"
+JOURNAL_FILE = "journal.jsonl"
+
+def job_key(job):
+    """Stable identifier of a (keyword, area, max_results) job."""
+    return f"{job['keyword']}\t{job['area']}\t{job['max_results']}"
+
+def lead_key(lead):
+    return (lead.get("Search Query"), lead.get("Link"))
+
+def append_jsonl(path, record):
+    """Append one record and force it to disk, so a crash loses nothing already written."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def read_jsonl(path):
+    """Yield records from a JSONL file. A truncated last line (crash mid-write) is skipped."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def _terminate_partial_line(path):
+    """After a crash mid-write, end the broken line so new records start cleanly."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+def open_run(run_dir):
+    """
+    Create/open a run directory and return its state:
+    {"leads_path", "journal_path", "done_jobs": set, "seen_leads": set}
+    """
+    os.makedirs(run_dir, exist_ok=True)
+    leads_path = os.path.join(run_dir, LEADS_FILE)
+    journal_path = os.path.join(run_dir, JOURNAL_FILE)
+    for path in (leads_path, journal_path):
+        _terminate_partial_line(path)
+    return {
+        "leads_path": leads_path,
+        "journal_path": journal_path,
+        "done_jobs": {entry["job"] for entry in read_jsonl(journal_path)},
+        "seen_leads": {lead_key(lead) for lead in read_jsonl(leads_path)},
+    }
+
+def record_lead(run, lead):
+    """Append a lead unless the same (query, link) is already stored. Returns True if written."""
+    key = lead_key(lead)
+    if key in run["seen_leads"]:
+        return False
+    append_jsonl(run["leads_path"], lead)
+    run["seen_leads"].add(key)
+    return True
+
+def mark_job_done(run, job, lead_count):
+    key = job_key(job)
+    append_jsonl(run["journal_path"], {"job": key, "leads": lead_count, "finished_at": int(time.time())})
+    run["done_jobs"].add(key)
+
+def load_leads(run):
+    return list(read_jsonl(run["leads_path"]))
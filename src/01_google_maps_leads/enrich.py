@@ -0,0 +1,144 @@
+"""
+Detail-page enrichment (Phone / Address).
+=========================================
+Visits each lead's /maps/place/ link and fills in the "Phone" and
+"Address" columns. Pages are loaded by a bounded pool of browsers
+(one driver per worker thread), with a minimum interval between
+requests to the same host so the pool does not hammer Google.
+
+Throughput is logged as places per minute.
+"""
+
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from waits import wait_for
+
+DEFAULT_WORKERS = 3
+DEFAULT_MIN_INTERVAL = 1.0   # seconds between page loads per host (across all workers)
+DETAIL_TIMEOUT = 10
+
+DETAILS_READY_JS = """
+return !!(document.querySelector("button[data-item-id='address']")
+          || document.querySelector("button[data-item-id^='phone:tel:']"));
+"""
+
+DETAILS_JS = """
+const value = btn => {
+    if (!btn) return "";
+    const inner = btn.querySelector(".Io6YTe");
+    return (inner ? inner.innerText : btn.getAttribute("aria-label") || "").trim();
+};
+const phone = document.querySelector("button[data-item-id^='phone:tel:']");
+const address = document.querySelector("button[data-item-id='address']");
+const website = document.querySelector("a[data-item-id='authority']");
+return {
+    phone: value(phone),
+    address: value(address),
+    website: website ? website.href : "",
+};
+"""
+
+class HostPacer:
+    """Thread-safe minimum interval between requests to the same host."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def fetch_details(driver, link, timeout=DETAIL_TIMEOUT):
+    """Open a place page and return {"phone", "address", "website"}."""
+    driver.get(link)
+    wait_for(lambda: driver.execute_script(DETAILS_READY_JS), timeout)
+    return driver.execute_script(DETAILS_JS) or {}
+
+def enrich_leads(leads, make_driver, workers=DEFAULT_WORKERS, min_interval=DEFAULT_MIN_INTERVAL,
+                 timeout=DETAIL_TIMEOUT):
+    """
+    Fill "Phone" and "Address" (and "Website") in-place for each lead dict with a Link.
+    :param make_driver: callable returning a new WebDriver (one is created per worker).
+    :param workers: maximum number of browsers loading pages at the same time.
+    :param min_interval: minimum seconds between page loads to the same host.
+    Returns stats: {"places", "failed", "seconds", "places_per_minute"}.
+    """
+    todo = [lead for lead in leads if lead.get("Link") and not lead.get("Address")]
+    if not todo:
+        return {"places": 0, "failed": 0, "seconds": 0.0, "places_per_minute": 0.0}
+
+    pacer = HostPacer(min_interval)
+    local = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+
+    def get_driver():
+        if getattr(local, "driver", None) is None:
+            local.driver = make_driver()
+            with drivers_lock:
+                drivers.append(local.driver)
+        return local.driver
+
+    def work(lead):
+        driver = get_driver()
+        pacer.wait(lead["Link"])
+        try:
+            details = fetch_details(driver, lead["Link"], timeout)
+        except Exception:
+            # Drop a possibly broken browser; the next task on this thread starts a fresh one
+            local.driver = None
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            with drivers_lock:
+                drivers.remove(driver)
+            raise
+        lead["Phone"] = details.get("phone", "")
+        lead["Address"] = details.get("address", "")
+        lead["Website"] = details.get("website", "")
+
+    workers = max(1, min(workers, len(todo)))
+    logging.info(f"Enriching {len(todo)} places with {workers} browsers (min {min_interval}s per host)...")
+    started = time.perf_counter()
+    failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(work, lead): lead for lead in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    logging.warning(f"  Detail fetch failed for {futures[future].get('Name')}: {e}")
+                if done % 10 == 0 or done == len(todo):
+                    elapsed = time.perf_counter() - started
+                    logging.info(f"  Enriched {done}/{len(todo)} ({done / elapsed * 60:.1f} places/min)")
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "places": len(todo),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "places_per_minute": round(len(todo) / elapsed * 60, 1) if elapsed else 0.0,
+    }
+    logging.info(f"Enrichment done: {stats}")
+    return stats
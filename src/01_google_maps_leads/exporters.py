@@ -0,0 +1,179 @@
+"""
+Streaming export writers for leads.
+===================================
+Writes rows one at a time instead of building a pandas DataFrame, so memory
+stays flat at tens of thousands of leads and pandas is never imported.
+
+Formats (chosen by file extension or explicitly):
+    .xlsx     openpyxl write-only workbook (constant memory)
+    .csv      csv module (UTF-8 with BOM so Excel opens Japanese text correctly)
+    .jsonl    one JSON object per line
+    .parquet  pyarrow, written in row groups (optional: pip install pyarrow)
+
+Usage:
+    from exporters import export
+    export(leads, "leads.xlsx")
+
+    # Compare time and peak memory of every format on synthetic leads
+    python exporters.py bench --rows 50000
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+import itertools
+import tracemalloc
+
+FORMATS = ("xlsx", "csv", "jsonl", "parquet")
+PARQUET_BATCH_ROWS = 10000
+
+def detect_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(FORMATS)})")
+    return fmt
+
+def _columns(first_rows):
+    """Column order = first appearance of each key in the sampled rows."""
+    columns = []
+    for row in first_rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    return columns
+
+def _cell(value):
+    return "" if value is None else value
+
+def write_xlsx(path, columns, rows):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(columns)
+    count = 0
+    for row in rows:
+        ws.append([_cell(row.get(c)) for c in columns])
+        count += 1
+    wb.save(path)
+    return count
+
+def write_csv(path, columns, rows):
+    count = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def write_jsonl(path, columns, rows):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps({c: row.get(c) for c in columns}, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+def write_parquet(path, columns, rows):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            batch = list(itertools.islice(rows, PARQUET_BATCH_ROWS))
+            if not batch:
+                break
+            data = {c: [None if r.get(c) is None else str(r.get(c)) for r in batch] for c in columns}
+            writer.write_table(pa.table(data, schema=schema))
+            count += len(batch)
+    return count
+
+WRITERS = {
+    "xlsx": write_xlsx,
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+def export(rows, path, fmt=None, columns=None, measure=False):
+    """
+    Write `rows` (an iterable of dicts; may be a generator) to `path`.
+    Columns default to the keys of the first 100 rows in order of appearance.
+    With `measure=True`, peak Python memory during the export is tracked.
+    Returns stats: {"format", "rows", "seconds", "peak_mb"}.
+    """
+    fmt = detect_format(path, fmt)
+    rows = iter(rows)
+    if columns is None:
+        head = list(itertools.islice(rows, 100))
+        columns = _columns(head)
+        rows = itertools.chain(head, rows)
+
+    if measure:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        count = WRITERS[fmt](path, columns, rows)
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if measure else None
+        if measure:
+            tracemalloc.stop()
+    stats = {
+        "format": fmt,
+        "rows": count,
+        "seconds": round(time.perf_counter() - started, 3),
+        "peak_mb": round(peak / (1024 * 1024), 2) if peak is not None else None,
+    }
+    logging.info(f"Exported {count} rows to {path} in {stats['seconds']}s"
+                 + (f" (peak {stats['peak_mb']} MB)" if measure else ""))
+    return stats
+
+def sample_leads(n):
+    """Synthetic leads with realistic column sizes, generated lazily."""
+    for i in range(n):
+        yield {
+            "Name": f"サンプル店舗 {i}",
+            "Search Query": "新宿 カフェ",
+            "Link": f"https://www.google.com/maps/place/shop{i}/data=!4m7!3m6!1s0x6018{i:012x}:0x{i:016x}",
+            "Phone": f"03-{i % 10000:04d}-{i % 9973:04d}",
+            "Address": f"東京都新宿区西新宿{i % 9 + 1}丁目{i % 30 + 1}-{i % 15 + 1}",
+        }
+
+def bench(rows=50000, out_dir=".", formats=FORMATS):
+    """Export `rows` synthetic leads in every format and print time, peak memory and size."""
+    print(f"--- Export Benchmark ({rows} rows) ---")
+    results = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"export_bench.{fmt}")
+        try:
+            stats = export(sample_leads(rows), path, measure=True)
+        except ImportError as e:
+            print(f"  {fmt:<8} skipped ({e})")
+            continue
+        stats["size_mb"] = round(os.path.getsize(path) / (1024 * 1024), 2)
+        os.remove(path)
+        results.append(stats)
+        print(f"  {fmt:<8} {stats['seconds']:7.2f}s  peak {stats['peak_mb']:7.2f} MB  file {stats['size_mb']:6.2f} MB")
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Lead export writers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("bench", help="Compare export formats on synthetic leads")
+    b.add_argument("--rows", type=int, default=50000)
+    b.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(args.rows, formats=args.formats)
@@ -0,0 +1,183 @@
+"""
+Persistent lead database (SQLite).
+==================================
+Keeps every lead ever scraped, keyed by a normalized place identifier
+parsed from the /maps/place/ link, so overlapping searches ("Shinjuku cafe",
+"Shibuya cafe") and daily re-runs do not produce duplicates.
+
+Each upsert is a primary-key lookup, so dedup stays cheap at hundreds of
+thousands of rows. Leads remember the run that first saw them, which makes
+"new since last run" a single indexed query.
+
+Usage:
+    python scraper.py --batch jobs.csv --db leads.db
+    python lead_db.py leads.db --new --output new_leads.xlsx
+    python lead_db.py leads.db --stats
+"""
+
+import re
+import time
+import sqlite3
+import logging
+import argparse
+from urllib.parse import unquote, urlsplit
+
+import exporters
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS leads (
+    place_id     TEXT PRIMARY KEY,
+    name         TEXT,
+    link         TEXT,
+    search_query TEXT,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    seen_count   INTEGER NOT NULL DEFAULT 1,
+    first_run_id INTEGER,
+    phone        TEXT,
+    address      TEXT,
+    website      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leads_first_run ON leads(first_run_id);
+CREATE INDEX IF NOT EXISTS idx_leads_first_seen ON leads(first_seen);
+"""
+
+# Feature ID pair, e.g. !1s0x60188cd0e0a7b6b1:0x5a7f9d...
+FEATURE_ID_PATTERN = re.compile(r"!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)")
+# Knowledge graph ID, e.g. !16s%2Fg%2F11c1qk8z0m
+KG_ID_PATTERN = re.compile(r"!16s([^!?&]+)")
+COORD_PATTERN = re.compile(r"!3d(-?[\d.]+)!4d(-?[\d.]+)")
+
+LEAD_COLUMNS = ["place_id", "name", "phone", "address", "website", "link", "search_query",
+                "first_seen", "last_seen", "seen_count"]
+# Columns added after the first release; created on older databases by connect()
+DETAIL_COLUMNS = ["phone", "address", "website"]
+
+def normalize_place_id(link):
+    """
+    Return a stable identifier for a Google Maps place link.
+    Prefers the feature ID, then the knowledge graph ID, then name+coordinates,
+    and finally the /maps/place/<name> part of the link path.
+    """
+    if not link:
+        return None
+    match = FEATURE_ID_PATTERN.search(link)
+    if match:
+        return match.group(1).lower()
+    match = KG_ID_PATTERN.search(link)
+    if match:
+        return "kg:" + unquote(match.group(1))
+
+    path = unquote(urlsplit(link).path)
+    name = path.split("/maps/place/", 1)[-1].split("/", 1)[0]
+    match = COORD_PATTERN.search(link)
+    if match:
+        return f"geo:{name}@{float(match.group(1)):.6f},{float(match.group(2)):.6f}"
+    if "/maps/place/" in path:
+        # Drop /@lat,lng,zoom and everything after it: the viewport differs per search
+        return f"path:/maps/place/{name}"
+    return "path:" + "/".join(part for part in path.split("/") if not part.startswith("@")).rstrip("/")
+
+def connect(db_path):
+    """Open (and create if needed) the lead database."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(leads)")}
+    for column in DETAIL_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE leads ADD COLUMN {column} TEXT")
+    return conn
+
+def begin_run(conn):
+    """Register a new scraper run and return its id."""
+    cur = conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+    conn.commit()
+    return cur.lastrowid
+
+def finish_run(conn, run_id):
+    conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+    conn.commit()
+
+def upsert_lead(conn, lead, run_id=None):
+    """
+    Insert a lead or refresh its last_seen timestamp.
+    Returns True if the place was not in the database before.
+    The caller commits (e.g. once per query).
+    """
+    place_id = normalize_place_id(lead.get("Link"))
+    if not place_id:
+        return False
+    now = time.time()
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO leads (place_id, name, link, search_query, first_seen, last_seen, first_run_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (place_id, lead.get("Name"), lead.get("Link"), lead.get("Search Query"), now, now, run_id),
+    )
+    if cur.rowcount:
+        return True
+    conn.execute(
+        "UPDATE leads SET last_seen = ?, seen_count = seen_count + 1 WHERE place_id = ?",
+        (now, place_id),
+    )
+    return False
+
+def update_details(conn, lead):
+    """Store enrichment columns (Phone / Address / Website) for a lead. The caller commits."""
+    place_id = normalize_place_id(lead.get("Link"))
+    if not place_id:
+        return
+    conn.execute(
+        "UPDATE leads SET phone = COALESCE(?, phone), address = COALESCE(?, address), "
+        "website = COALESCE(?, website) WHERE place_id = ?",
+        (lead.get("Phone"), lead.get("Address"), lead.get("Website"), place_id),
+    )
+
+def last_run_id(conn):
+    row = conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+    return row[0]
+
+def new_leads(conn, run_id=None):
+    """Leads first seen in `run_id` (default: the latest run)."""
+    run_id = run_id if run_id is not None else last_run_id(conn)
+    rows = conn.execute(
+        f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads WHERE first_run_id = ? ORDER BY first_seen",
+        (run_id,),
+    )
+    return [dict(row) for row in rows]
+
+def all_leads(conn):
+    rows = conn.execute(f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads ORDER BY first_seen")
+    return [dict(row) for row in rows]
+
+def stats(conn):
+    total = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+    runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    run_id = last_run_id(conn)
+    new = conn.execute("SELECT COUNT(*) FROM leads WHERE first_run_id = ?", (run_id,)).fetchone()[0]
+    return {"leads": total, "runs": runs, "new_in_last_run": new}
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Lead database")
+    parser.add_argument("db", help="SQLite database file")
+    parser.add_argument("--new", action="store_true", help="Only leads new in the latest run")
+    parser.add_argument("--output", help="Export to .xlsx / .csv / .jsonl / .parquet")
+    parser.add_argument("--stats", action="store_true", help="Show counts")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.stats or not args.output:
+        print(stats(conn))
+    if args.output:
+        rows = new_leads(conn) if args.new else all_leads(conn)
+        exporters.export(rows, args.output, columns=LEAD_COLUMNS)
+    conn.close()
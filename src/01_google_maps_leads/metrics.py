@@ -0,0 +1,171 @@
+"""
+Per-query metrics for the Google Maps scraper.
+==============================================
+Records, for every query:
+    - wall time per stage (open / search / wait / scroll / extract)
+    - number of WebDriver commands issued (every HTTP call to chromedriver)
+    - items seen and kept
+    - which selector fallback paths were taken
+
+The state lives on the driver object (like driver.startup_timings from
+utils/driver_factory.py), so the scraper functions only need the driver.
+Functions here are no-ops for drivers that were not instrumented.
+
+Each finished query is logged as one JSON record, optionally appended to a
+JSONL file and written as a Prometheus textfile (node_exporter textfile
+collector) via configure().
+"""
+
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+
+_sinks = {"jsonl": None, "prom": None}
+_totals = {"queries": 0, "leads": 0, "commands": 0, "fallbacks": {}}
+
+def configure(jsonl_path=None, prom_path=None):
+    """Set where finished query records are written (both optional)."""
+    _sinks["jsonl"] = jsonl_path
+    _sinks["prom"] = prom_path
+
+def instrument(driver):
+    """Count every WebDriver command sent through `driver` (elements share the driver's execute)."""
+    if getattr(driver, "command_count", None) is not None:
+        return driver
+    driver.command_count = 0
+    driver.query_metrics = None
+    driver.pending_stages = {}
+    original_execute = driver.execute
+
+    def execute(driver_command, params=None):
+        driver.command_count += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = execute
+    return driver
+
+def _target(driver):
+    """Stage times go to the running query, or are kept until the next query starts."""
+    record = getattr(driver, "query_metrics", None)
+    if record is not None:
+        return record["stages"]
+    return getattr(driver, "pending_stages", None)
+
+@contextmanager
+def stage(driver, name):
+    """Add the wall time of the `with` block to stage `name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = _target(driver)
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+def count(driver, key, n=1):
+    """Increase a counter (e.g. items_seen / items_kept) of the running query."""
+    record = getattr(driver, "query_metrics", None)
+    if record is not None:
+        record[key] = record.get(key, 0) + n
+
+def fallback(driver, path):
+    """Note that a selector path (e.g. 'search_box:name_q') was used."""
+    record = getattr(driver, "query_metrics", None)
+    if record is not None:
+        record["fallbacks"][path] = record["fallbacks"].get(path, 0) + 1
+
+def start_query(driver, search_query):
+    if getattr(driver, "command_count", None) is None:
+        return
+    stages = dict(driver.pending_stages)
+    driver.pending_stages = {}
+    # Report browser boot once, with the first query of this driver
+    startup = getattr(driver, "startup_timings", None)
+    if startup and not getattr(driver, "startup_reported", False):
+        stages["driver_startup"] = sum(startup.values())
+        driver.startup_reported = True
+    driver.query_metrics = {
+        "query": search_query,
+        "started_at": time.time(),
+        "stages": stages,
+        "items_seen": 0,
+        "items_kept": 0,
+        "fallbacks": {},
+        "_commands_start": driver.command_count,
+        "_perf_start": time.perf_counter(),
+    }
+
+def finish_query(driver, ok=True):
+    """Close the running query record, emit it and return it (None if not instrumented)."""
+    record = getattr(driver, "query_metrics", None)
+    if record is None:
+        return None
+    driver.query_metrics = None
+    record["ok"] = ok
+    record["seconds"] = round(time.perf_counter() - record.pop("_perf_start"), 3)
+    record["webdriver_commands"] = driver.command_count - record.pop("_commands_start")
+    record["stages"] = {name: round(sec, 3) for name, sec in record["stages"].items()}
+    emit(record)
+    return record
+
+def emit(record):
+    logging.info(f"Query metrics: {json.dumps(record, ensure_ascii=False)}")
+
+    _totals["queries"] += 1
+    _totals["leads"] += record["items_kept"]
+    _totals["commands"] += record["webdriver_commands"]
+    for path, n in record["fallbacks"].items():
+        _totals["fallbacks"][path] = _totals["fallbacks"].get(path, 0) + n
+
+    if _sinks["jsonl"]:
+        with open(_sinks["jsonl"], "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if _sinks["prom"]:
+        write_prometheus(_sinks["prom"], record)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def write_prometheus(path, record):
+    """Write the last query and process totals in Prometheus text format (atomic rename)."""
+    lines = [
+        "# HELP maps_scraper_query_stage_seconds Wall time per stage of the last query.",
+        "# TYPE maps_scraper_query_stage_seconds gauge",
+    ]
+    for name, sec in record["stages"].items():
+        lines.append(f'maps_scraper_query_stage_seconds{{stage="{_escape(name)}"}} {sec}')
+    lines += [
+        "# HELP maps_scraper_query_seconds Wall time of the last query.",
+        "# TYPE maps_scraper_query_seconds gauge",
+        f"maps_scraper_query_seconds {record['seconds']}",
+        "# HELP maps_scraper_query_webdriver_commands WebDriver commands issued by the last query.",
+        "# TYPE maps_scraper_query_webdriver_commands gauge",
+        f"maps_scraper_query_webdriver_commands {record['webdriver_commands']}",
+        "# HELP maps_scraper_query_items Items seen / kept by the last query.",
+        "# TYPE maps_scraper_query_items gauge",
+        f'maps_scraper_query_items{{kind="seen"}} {record["items_seen"]}',
+        f'maps_scraper_query_items{{kind="kept"}} {record["items_kept"]}',
+        "# HELP maps_scraper_last_query_timestamp_seconds Unix time the last query started.",
+        "# TYPE maps_scraper_last_query_timestamp_seconds gauge",
+        f"maps_scraper_last_query_timestamp_seconds {record['started_at']:.0f}",
+        "# HELP maps_scraper_queries_total Queries run by this process.",
+        "# TYPE maps_scraper_queries_total counter",
+        f"maps_scraper_queries_total {_totals['queries']}",
+        "# HELP maps_scraper_leads_total Leads kept by this process.",
+        "# TYPE maps_scraper_leads_total counter",
+        f"maps_scraper_leads_total {_totals['leads']}",
+        "# HELP maps_scraper_webdriver_commands_total WebDriver commands issued by this process.",
+        "# TYPE maps_scraper_webdriver_commands_total counter",
+        f"maps_scraper_webdriver_commands_total {_totals['commands']}",
+        "# HELP maps_scraper_fallbacks_total Selector paths taken by this process.",
+        "# TYPE maps_scraper_fallbacks_total counter",
+    ]
+    for fallback_path, n in sorted(_totals["fallbacks"].items()):
+        lines.append(f'maps_scraper_fallbacks_total{{path="{_escape(fallback_path)}"}} {n}')
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
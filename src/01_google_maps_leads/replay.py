@@ -0,0 +1,182 @@
+"""
+Offline replay harness and extraction benchmark.
+================================================
+Saves the DOM of a loaded Google Maps results page to disk, then replays
+it from file:// (or a localhost server) to measure and regression-test the
+scraper's selectors without touching Google. Replay needs no network.
+
+Saved fixtures have all <script> tags removed and a Content-Security-Policy
+that blocks external requests, so the page is static and loads instantly.
+
+Usage:
+    # Record (needs network): run one live query and save the results page
+    python replay.py record --keyword Cafe --area Shinjuku --out fixtures/
+
+    # Benchmark (offline): time search box discovery, the three item
+    # selector fallbacks and per-item extraction against every fixture
+    python replay.py bench fixtures/ --headless
+    python replay.py bench fixtures/ --serve --json bench.json --expect-min 10
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import logging
+import argparse
+import threading
+import functools
+from pathlib import Path
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import scraper
+
+OFFLINE_CSP = ('<meta http-equiv="Content-Security-Policy" '
+               'content="default-src \'none\'; style-src \'unsafe-inline\'; img-src data:">')
+
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+HEAD_PATTERN = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+
+def make_static(html):
+    """Strip scripts and block network access so the page replays offline."""
+    html = SCRIPT_PATTERN.sub("", html)
+    match = HEAD_PATTERN.search(html)
+    if match:
+        return html[:match.end()] + OFFLINE_CSP + html[match.end():]
+    return OFFLINE_CSP + html
+
+def save_fixture(driver, out_dir, label):
+    """Save the current page DOM as <out_dir>/<label>.html and return the path."""
+    os.makedirs(out_dir, exist_ok=True)
+    html = driver.execute_script("return '<!DOCTYPE html>' + document.documentElement.outerHTML;")
+    safe = re.sub(r"[^\w.-]+", "_", label).strip("_") or "fixture"
+    path = os.path.join(out_dir, f"{safe}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(make_static(html))
+    logging.info(f"Saved fixture: {path}")
+    return path
+
+def record(keyword, area, out_dir, max_results=20, headless=False):
+    """Run one live query and save the loaded results page as a fixture."""
+    driver = scraper.setup_driver(headless=headless)
+    try:
+        scraper.open_maps(driver)
+        results = scraper.run_query(driver, keyword, area, max_results)
+        logging.info(f"Live query returned {len(results)} leads")
+        return save_fixture(driver, out_dir, f"{area}_{keyword}")
+    finally:
+        driver.quit()
+
+def serve_directory(directory):
+    """Serve `directory` on a random localhost port. Returns (server, base_url)."""
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+def _timed(func):
+    started = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - started) * 1000
+
+def bench_page(driver, url):
+    """Time each extraction step on one loaded fixture. Returns a dict of ms / counts."""
+    driver.get(url)
+    row = {"fixture": url.rsplit("/", 1)[-1]}
+
+    _, row["search_box_ms"] = _timed(lambda: scraper.find_search_box(driver))
+
+    for name, find in scraper.ITEM_STRATEGIES.items():
+        try:
+            items, ms = _timed(lambda: find(driver))
+        except Exception:
+            items, ms = [], 0.0
+        row[f"{name}_items"] = len(items)
+        row[f"{name}_ms"] = ms
+
+    items = scraper.find_result_items(driver)
+    pairs, ms = _timed(lambda: [scraper.extract_item(item) for item in items])
+    row["items"] = len(items)
+    row["element_extract_ms"] = ms
+    row["element_per_item_ms"] = ms / len(items) if items else 0.0
+
+    (total, bulk_pairs), ms = _timed(lambda: scraper.extract_items_bulk(driver))
+    row["bulk_extract_ms"] = ms
+    row["bulk_per_item_ms"] = ms / total if total else 0.0
+    row["links"] = len({link for _, link in bulk_pairs if link})
+    row["bulk_matches_element"] = bulk_pairs == pairs
+    return row
+
+def bench(fixture_dir, headless=True, serve=False, repeat=3):
+    """Benchmark every *.html fixture in `fixture_dir`. Returns one row per fixture (best of `repeat`)."""
+    fixtures = sorted(glob.glob(os.path.join(fixture_dir, "*.html")))
+    if not fixtures:
+        raise SystemExit(f"No fixtures found in {fixture_dir}")
+
+    server = None
+    if serve:
+        server, base_url = serve_directory(fixture_dir)
+        urls = [base_url + os.path.basename(path) for path in fixtures]
+    else:
+        urls = [Path(path).resolve().as_uri() for path in fixtures]
+
+    driver = scraper.setup_driver(headless=headless)
+    rows = []
+    try:
+        for url in urls:
+            runs = [bench_page(driver, url) for _ in range(repeat)]
+            best = dict(runs[0])
+            for key in best:
+                if key.endswith("_ms"):
+                    best[key] = round(min(r[key] for r in runs), 2)
+            rows.append(best)
+    finally:
+        driver.quit()
+        if server:
+            server.shutdown()
+    return rows
+
+def print_rows(rows):
+    print("--- Extraction Benchmark (best of runs, ms) ---")
+    for row in rows:
+        print(f"{row['fixture']}: {row['items']} items, {row['links']} links")
+        print(f"  search box     {row['search_box_ms']:8.2f}")
+        for name in ("article", "hfpxzc", "place_link"):
+            print(f"  {name:<14} {row[name + '_ms']:8.2f}  ({row[name + '_items']} items)")
+        print(f"  element total  {row['element_extract_ms']:8.2f}  ({row['element_per_item_ms']:.2f}/item)")
+        print(f"  bulk total     {row['bulk_extract_ms']:8.2f}  ({row['bulk_per_item_ms']:.3f}/item)"
+              f"  same result: {row['bulk_matches_element']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline replay harness for the Maps scraper")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run a live query and save the results page")
+    rec.add_argument("--keyword", default="Cafe")
+    rec.add_argument("--area", default="Shinjuku")
+    rec.add_argument("--out", default="fixtures")
+    rec.add_argument("--headless", action="store_true")
+
+    b = sub.add_parser("bench", help="Benchmark extraction against saved fixtures (offline)")
+    b.add_argument("fixtures", help="Directory of saved *.html fixtures")
+    b.add_argument("--headless", action="store_true")
+    b.add_argument("--serve", action="store_true", help="Serve fixtures from localhost instead of file://")
+    b.add_argument("--repeat", type=int, default=3)
+    b.add_argument("--json", help="Also write results to this JSON file")
+    b.add_argument("--expect-min", type=int, default=0,
+                   help="Exit with an error if any fixture yields fewer links (selector regression check)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.keyword, args.area, args.out, headless=args.headless)
+    else:
+        rows = bench(args.fixtures, headless=args.headless, serve=args.serve, repeat=args.repeat)
+        print_rows(rows)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(rows, f, indent=2)
+        broken = [row["fixture"] for row in rows if row["links"] < args.expect_min]
+        if broken:
+            raise SystemExit(f"Selector regression: fewer than {args.expect_min} links in {broken}")
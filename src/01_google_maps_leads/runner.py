@@ -0,0 +1,267 @@
+"""
+Multi-process job runner for large keyword x area grids.
+========================================================
+Shards a job list (same CSV/JSONL format as `scraper.py --batch`) across
+N worker processes. Each worker owns one Chrome driver and runs its shard
+with scraper.run_jobs(), checkpointing into <run_dir>/worker_<k>/.
+
+- A global pacing budget (--min-interval) is shared by all workers, so
+  adding workers does not multiply the request rate against Google.
+- Results of all workers are merged and deduplicated by place ID.
+- Per-worker stats (queries, leads, failures, driver restarts, time) are
+  printed at the end.
+- Memory: each worker costs roughly one Chrome + chromedriver + Python
+  (--mem-per-worker-mb). N is capped to what fits in available RAM.
+
+Usage:
+    python runner.py jobs.csv --workers 4 --headless
+    python runner.py jobs.csv --workers 4 --min-interval 5 --db leads.db --output grid.xlsx
+"""
+
+import os
+import glob
+import time
+import queue
+import logging
+import argparse
+import multiprocessing as mp
+
+import checkpoint
+import exporters
+import lead_db
+import metrics
+import scraper
+
+DEFAULT_MEM_PER_WORKER_MB = 800
+STATS_POLL_SECONDS = 5.0
+
+def available_memory_mb():
+    """
+    Memory available for new processes in MB, or None if the platform does not tell us.
+    Uses psutil if installed, else MemAvailable from /proc/meminfo (Linux). Both count
+    reclaimable page cache; sysconf's free pages (last resort) do not and read far too low.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024  # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def plan_workers(requested, mem_per_worker_mb=DEFAULT_MEM_PER_WORKER_MB):
+    """Cap the worker count to CPU count and available RAM."""
+    workers = max(1, min(requested, os.cpu_count() or 1))
+    available = available_memory_mb()
+    if available:
+        fits = max(1, int(available // mem_per_worker_mb))
+        if fits < workers:
+            logging.warning(f"Only {available:.0f} MB available; reducing workers {workers} -> {fits}")
+            workers = fits
+        logging.info(f"Memory plan: {workers} x {mem_per_worker_mb} MB = {workers * mem_per_worker_mb} MB "
+                     f"(available {available:.0f} MB)")
+    return workers
+
+def acquire_slot(next_slot, min_interval):
+    """Block until the shared pacing budget allows the next query (across all processes)."""
+    if min_interval <= 0:
+        return
+    with next_slot.get_lock():
+        now = time.time()
+        slot = max(now, next_slot.value)
+        next_slot.value = slot + min_interval
+    delay = slot - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+def worker_main(worker_id, jobs, run_dir, options, next_slot, stats_queue):
+    """Entry point of one worker process."""
+    logging.basicConfig(level=logging.INFO, force=True,
+                        format=f'%(asctime)s - W{worker_id} - %(levelname)s - %(message)s')
+    prom_path = options.get("prom_file")
+    if prom_path:
+        # One textfile per worker; the textfile collector reads all *.prom files in the directory
+        root, ext = os.path.splitext(prom_path)
+        prom_path = f"{root}_w{worker_id}{ext or '.prom'}"
+    metrics.configure(jsonl_path=options.get("metrics_file"), prom_path=prom_path)
+
+    stats = {"queries": 0, "failed": len(jobs), "leads": 0, "driver_starts": 0, "seconds": 0.0}
+    try:
+        run = checkpoint.open_run(os.path.join(run_dir, f"worker_{worker_id}"))
+        stats = scraper.run_jobs(
+            jobs, run,
+            headless=options["headless"],
+            recycle_every=options["recycle_every"],
+            max_memory_mb=options["max_memory_mb"],
+            extraction=options["extraction"],
+            before_query=lambda: acquire_slot(next_slot, options["min_interval"]),
+            lean=options["lean"],
+        )
+    except Exception as e:
+        # Always report back, otherwise the parent would wait forever
+        logging.error(f"Worker crashed: {e}")
+    stats["worker"] = worker_id
+    stats["jobs"] = len(jobs)
+    try:
+        import resource
+        # ru_maxrss is KB on Linux (bytes on macOS); the Python side only, Chrome is separate
+        stats["python_peak_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:
+        pass
+    stats_queue.put(stats)
+
+def collect_stats(processes, shards, stats_queue, poll=STATS_POLL_SECONDS):
+    """
+    Wait for the stats of every worker in `processes` ({worker_id: Process}).
+    A worker killed without reporting (OOM killer, segfault, SIGKILL) gets a
+    stats entry marked crashed, with its whole shard counted as failed.
+    """
+    stats = {}
+    while len(stats) < len(processes):
+        try:
+            s = stats_queue.get(timeout=poll)
+            stats[s["worker"]] = s
+            continue
+        except queue.Empty:
+            pass
+        dead = [k for k, p in processes.items() if k not in stats and not p.is_alive()]
+        if not dead:
+            continue
+        # A worker that reported just before exiting: its stats are already in the pipe
+        try:
+            while True:
+                s = stats_queue.get(timeout=1)
+                stats[s["worker"]] = s
+        except queue.Empty:
+            pass
+        for k in dead:
+            if k in stats:
+                continue
+            exitcode = processes[k].exitcode
+            logging.error(f"Worker {k} died without reporting (exit code {exitcode})")
+            stats[k] = {"worker": k, "jobs": len(shards[k]), "queries": 0, "failed": len(shards[k]), "leads": 0,
+                        "driver_starts": 0, "seconds": 0.0, "crashed": True, "exitcode": exitcode}
+    return list(stats.values())
+
+def worker_dirs(run_dir):
+    return sorted(glob.glob(os.path.join(run_dir, "worker_*")))
+
+def done_jobs(run_dir):
+    """Finished job keys from all worker journals (works even if N changed between runs)."""
+    done = set()
+    for path in worker_dirs(run_dir):
+        done |= checkpoint.open_run(path)["done_jobs"]
+    return done
+
+def merge_results(run_dir):
+    """Read every worker's leads and deduplicate them by place ID."""
+    merged = {}
+    total = 0
+    for path in worker_dirs(run_dir):
+        for lead in checkpoint.load_leads(checkpoint.open_run(path)):
+            total += 1
+            key = lead_db.normalize_place_id(lead.get("Link"))
+            if key and key not in merged:
+                merged[key] = lead
+    logging.info(f"Merged {total} leads from {len(worker_dirs(run_dir))} workers -> {len(merged)} unique places")
+    return list(merged.values())
+
+def run_sharded(jobs_path, workers=2, headless=True, min_interval=3.0, recycle_every=50, max_memory_mb=1024,
+                extraction=scraper.EXTRACTION_MODE, run_dir=None, output=None, db_path=None,
+                enrich_workers=0, mem_per_worker_mb=DEFAULT_MEM_PER_WORKER_MB, metrics_file=None, prom_file=None,
+                lean=False, fmt=None):
+    """
+    Shard jobs across worker processes, then merge, dedup and save the results.
+    Returns (merged_results, per_worker_stats).
+    """
+    jobs = scraper.load_jobs(jobs_path)
+    run_dir = run_dir or os.path.splitext(jobs_path)[0] + "_run"
+    os.makedirs(run_dir, exist_ok=True)
+    finished = done_jobs(run_dir)
+    pending = [job for job in jobs if checkpoint.job_key(job) not in finished]
+    logging.info(f"Loaded {len(jobs)} jobs ({len(jobs) - len(pending)} already done, run dir: {run_dir})")
+
+    workers = min(plan_workers(workers, mem_per_worker_mb), max(1, len(pending)))
+    shards = [pending[k::workers] for k in range(workers)]
+    options = {
+        "headless": headless,
+        "recycle_every": recycle_every,
+        "max_memory_mb": max_memory_mb,
+        "extraction": extraction,
+        "min_interval": min_interval,
+        "metrics_file": metrics_file,
+        "prom_file": prom_file,
+        "lean": lean,
+    }
+
+    next_slot = mp.Value("d", 0.0)
+    stats_queue = mp.Queue()
+    processes = {
+        k: mp.Process(target=worker_main, name=f"worker-{k}",
+                      args=(k, shard, run_dir, options, next_slot, stats_queue))
+        for k, shard in enumerate(shards) if shard
+    }
+    started = time.perf_counter()
+    for p in processes.values():
+        p.start()
+    worker_stats = collect_stats(processes, shards, stats_queue)
+    for p in processes.values():
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    worker_stats.sort(key=lambda s: s["worker"])
+    print("--- Worker Stats ---")
+    for s in worker_stats:
+        print(f"W{s['worker']}: {s['queries']}/{s['jobs']} queries, {s['leads']} leads, {s['failed']} failed, "
+              f"{s['driver_starts']} driver starts, {s['seconds']:.0f}s"
+              + (f", python peak {s['python_peak_mb']} MB" if "python_peak_mb" in s else "")
+              + (f", CRASHED (exit code {s['exitcode']})" if s.get("crashed") else ""))
+    queries = sum(s["queries"] for s in worker_stats)
+    if elapsed and queries:
+        print(f"Total: {queries} queries in {elapsed:.0f}s ({queries / elapsed * 60:.1f} queries/min)")
+
+    results = merge_results(run_dir)
+    if db_path and results:
+        scraper.store_in_db(db_path, results)
+    scraper.finish_results(results, output, headless=headless, db_path=db_path, enrich_workers=enrich_workers,
+                           lean=lean, fmt=fmt)
+    return results, worker_stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded Google Maps Scraper")
+    parser.add_argument("jobs", help="CSV/JSONL file of keyword,area,max_results jobs")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes (one Chrome each)")
+    parser.add_argument("--min-interval", type=float, default=3.0,
+                        help="Minimum seconds between queries across ALL workers (global pacing)")
+    parser.add_argument("--mem-per-worker-mb", type=int, default=DEFAULT_MEM_PER_WORKER_MB,
+                        help="Expected RAM per worker, used to cap --workers")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome in headless mode")
+    parser.add_argument("--lean", action="store_true", help="Block images, fonts, media and map tiles")
+    parser.add_argument("--output", help="Output file (.xlsx / .csv / .jsonl / .parquet)")
+    parser.add_argument("--format", choices=exporters.FORMATS, help="Output format")
+    parser.add_argument("--run-dir", help="Checkpoint directory for resuming (default: <jobs>_run)")
+    parser.add_argument("--db", help="SQLite lead database for cross-run dedup")
+    parser.add_argument("--enrich", type=int, default=0, metavar="N", help="Fetch Phone/Address with N browsers")
+    parser.add_argument("--recycle-every", type=int, default=50, help="Restart Chrome after N queries")
+    parser.add_argument("--max-memory-mb", type=int, default=1024,
+                        help="Restart Chrome above this many MB: Chrome process RSS if psutil is installed, "
+                             "else the page JS heap")
+    parser.add_argument("--extraction", choices=["bulk", "element"], default=scraper.EXTRACTION_MODE)
+    parser.add_argument("--metrics-file", help="Append one JSON metrics record per query to this file")
+    parser.add_argument("--prom-file", help="Prometheus textfile path (one file per worker: <name>_w<k>.prom)")
+    args = parser.parse_args()
+
+    run_sharded(args.jobs, workers=args.workers, headless=args.headless, min_interval=args.min_interval,
+                recycle_every=args.recycle_every, max_memory_mb=args.max_memory_mb, extraction=args.extraction,
+                run_dir=args.run_dir, output=args.output, db_path=args.db, enrich_workers=args.enrich,
+                mem_per_worker_mb=args.mem_per_worker_mb, metrics_file=args.metrics_file, prom_file=args.prom_file,
+                lean=args.lean, fmt=args.format)
@@ -11,9 +11,25 @@ Usage:
     
     (Follow the interactive prompts to enter keyword and area)
 
+    Batch mode (one browser session for many queries):
+    python scraper.py --batch jobs.csv --headless
+    (Leads are checkpointed to jobs_run/; re-run the same command to resume)
+
+    Phone / Address from each place page (3 parallel browsers):
+    python scraper.py --batch jobs.csv --enrich 3
+
+    Large grids on several CPU cores: see runner.py
+
+    Lean browser (no images / fonts / media / map tiles) and its savings:
+    python scraper.py --batch jobs.csv --headless --lean
+    python scraper.py --compare-lean --headless
+
+    Per-query timing / WebDriver call metrics (see metrics.py):
+    python scraper.py --batch jobs.csv --metrics-file metrics.jsonl --prom-file /var/lib/node_exporter/scraper.prom
+
 Requirements:
     - Chrome Browser installed
-    - Chromedriver (handled automatically by webdriver-manager)
+    - Chromedriver (resolved once by webdriver-manager and cached, see utils/driver_factory.py)
     - See requirements.txt
 
 ⚠️ WARNING:
@@ -22,44 +38,128 @@ Requirements:
     Recommended: ConoHa VPS / Xserver VPS
 """
 
+import csv
+import json
 import time
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+import argparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
 import os
+import sys
+
+# Shared driver factory lives in <repo>/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from utils.driver_factory import create_chrome_driver
+import checkpoint
+import enrich
+import exporters
+import lead_db
+import metrics
+import selector_cache
+from waits import (
+    WAIT_TIMEOUTS, wait_for, feed_activity, wait_for_consent_or_search, wait_for_consent_gone,
+    wait_for_url_change, wait_for_results, wait_for_feed_settled, mark_previous_results,
+    wait_for_results_replaced,
+)
 
 # Logger Setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def setup_driver(headless=False):
+MAPS_URL = "https://www.google.com/maps"
+DEFAULT_MAX_RESULTS = 20
+LEAD_COLUMNS = ["Name", "Phone", "Address", "Website", "Search Query", "Link"]
+MAX_SCROLLS = 60        # hard cap on scrolls per query
+PLATEAU_SCROLLS = 2     # stop after this many scrolls without new items
+EXTRACTION_MODE = "bulk"  # "bulk" (one execute_script) or "element" (per-item WebDriver calls)
+# Map tiles / satellite imagery / street view thumbnails, blocked in lean mode
+MAPS_TILE_URLS = ["*/maps/vt*", "*/kh/v=*", "*streetviewpixels*"]
+
+# Search box strategies (fallback chain, reordered by selector_cache.py).
+# Each returns a list of matching elements without waiting.
+SEARCH_BOX_STRATEGIES = {
+    # ID 'searchboxinput'
+    "id": lambda d: d.find_elements(By.ID, "searchboxinput"),
+    # Input with name="q"
+    "name_q": lambda d: d.find_elements(By.NAME, "q"),
+    # Any visible input
+    "visible_input": lambda d: [i for i in d.find_elements(By.TAG_NAME, "input") if i.is_displayed()],
+}
+SEARCH_BOX_SHORT_TIMEOUT = 3   # wait for the learned favourite strategy
+SEARCH_BOX_TIMEOUT = 20        # overall upper bound
+
+# Updated Selection Logic (2026/01)
+# Strategy: Look for the main feed, then find all direct child divs that look like results
+# Common structure: An article or a div with an aria-label (which is the business name)
+ITEM_STRATEGIES = {
+    # 'article' role (cleanest if available)
+    "article": lambda d: d.find_elements(By.CSS_SELECTOR, "div[role='article']"),
+    # Class 'hfpxzc' (Link overlay, very common in 2024-2025)
+    "hfpxzc": lambda d: d.find_elements(By.CLASS_NAME, "hfpxzc"),
+    # Fallback - Look for any link with /maps/place/ in href inside the feed
+    "place_link": lambda d: d.find_element(By.CSS_SELECTOR, "div[role='feed']")
+                             .find_elements(By.XPATH, ".//a[contains(@href, '/maps/place/')]"),
+}
+
+# In-page version of find_result_items + extract_item: same three selector
+# fallbacks (in the order given as arguments[1]), returns plain JSON for
+# every item from arguments[0] onwards.
+BULK_EXTRACT_JS = """
+const start = arguments[0] || 0;
+const order = arguments[1] || ["article", "hfpxzc", "place_link"];
+const strategies = {
+    article: () => document.querySelectorAll("div[role='article']"),
+    hfpxzc: () => document.getElementsByClassName("hfpxzc"),
+    place_link: () => {
+        const feed = document.querySelector("div[role='feed']");
+        return feed ? feed.querySelectorAll("a[href*='/maps/place/']") : [];
+    },
+};
+let method = null;
+let items = [];
+const failed = [];
+for (const name of order) {
+    items = Array.from(strategies[name]());
+    if (items.length) {
+        method = name;
+        break;
+    }
+    failed.push(name);
+}
+return {
+    method: method,
+    failed: failed,
+    total: items.length,
+    items: items.slice(start).map(el => {
+        const nested = el.querySelector("a");
+        const labelled = el.querySelector("[aria-label]");
+        return {
+            href: el.href || el.getAttribute("href"),
+            label: el.getAttribute("aria-label"),
+            nestedHref: nested ? nested.href : null,
+            nestedLabel: labelled ? labelled.getAttribute("aria-label") : null,
+            text: (el.innerText || "").slice(0, 500),
+        };
+    }),
+};
+"""
+
+def setup_driver(headless=False, lean=False):
     """
     Setup Chrome Driver.
     :param headless: If True, run in headless mode (no GUI).
+    :param lean: If True, block images, fonts, media and map tiles (only the sidebar is read).
     """
-    options = webdriver.ChromeOptions()
-    if headless:
-        options.add_argument('--headless')
-    
-    # Common options for stability
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--lang=ja-JP')
-    options.add_argument('--window-size=1920,1080')
-    
-    # Anti-detection (Basic)
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    driver = create_chrome_driver(
+        headless=headless,
+        extra_args=['--lang=ja-JP', '--window-size=1920,1080'],
+        lean=lean,
+        blocked_urls=MAPS_TILE_URLS,
+    )
+    # Count WebDriver commands and per-stage timings (see metrics.py)
+    return metrics.instrument(driver)
 
 def scroll_sidebar(driver):
     """
@@ -72,185 +172,613 @@ def scroll_sidebar(driver):
         feed = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
         
         # Scroll logic
+        before = feed_activity(driver)
         driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", feed)
-        time.sleep(2) # Wait for load
+        # Wait until new items arrived and the feed is quiet again (bounded)
+        wait_for_feed_settled(driver, min_count=before[0] if before else 0, timeout=WAIT_TIMEOUTS["scroll"])
         return True
     except Exception as e:
         # logging.warning(f"Scroll failed or end of list: {e}")
         return False
 
-def scrape_google_maps(keyword, area, max_results=20, headless=False):
+def open_maps(driver):
     """
-    Main scraping function.
+    Open Google Maps and dismiss the cookie consent popup if present.
+    Only needs to run once per browser session.
     """
-    search_query = f"{area} {keyword}"
-    logging.info(f"Starting scrape for: {search_query}")
-    
-    driver = setup_driver(headless=headless)
-    results = []
+    logging.info("Step 1: Opening Google Maps...")
+    with metrics.stage(driver, "open"):
+        driver.get(MAPS_URL)
+    logging.info("Step 2: Page opened. Waiting for load...")
 
+    # Handle Cookie Consent Popup (Common in EU/Japan)
+    logging.info("Step 3: Checking for cookie consent popup...")
     try:
-        logging.info("Step 1: Opening Google Maps...")
-        driver.get("https://www.google.com/maps")
-        logging.info("Step 2: Page opened. Waiting for load...")
-        wait = WebDriverWait(driver, 20)
-        
-        # Handle Cookie Consent Popup (Common in EU/Japan)
-        time.sleep(3)  # Give page time to load popup
-        logging.info("Step 3: Checking for cookie consent popup...")
-        try:
-            # Look for common consent button patterns
-            consent_buttons = driver.find_elements(By.XPATH, "//button[contains(., 'すべて同意') or contains(., 'Accept all') or contains(., '同意')]")
+        with metrics.stage(driver, "consent"):
+            # Returns as soon as the popup or the search box shows up
+            consent_buttons = wait_for_consent_or_search(driver)
             if consent_buttons:
                 consent_buttons[0].click()
                 logging.info("Dismissed cookie consent popup")
-                time.sleep(2)
+                wait_for_consent_gone(driver)
             else:
                 logging.info("No cookie consent popup found")
-        except Exception as consent_err:
-            logging.info(f"Cookie consent check error: {consent_err}")
+    except Exception as consent_err:
+        logging.info(f"Cookie consent check error: {consent_err}")
 
-        # Search Box
-        logging.info("Step 4: Looking for search box...")
-        search_box_input = None
-        
-        # Try ID 'searchboxinput' first
+def find_search_box(driver):
+    """
+    Locate the Maps search box, trying several selectors.
+    The strategy that worked last is tried first with a short wait
+    (see selector_cache.py), the others are checked once, and only then
+    are all strategies polled up to SEARCH_BOX_TIMEOUT.
+    """
+    logging.info("Step 4: Looking for search box...")
+    order = selector_cache.ordered("search_box")
+
+    for n, name in enumerate(order):
+        find = SEARCH_BOX_STRATEGIES[name]
+        found = wait_for(lambda: find(driver), SEARCH_BOX_SHORT_TIMEOUT if n == 0 else 0)
+        if found:
+            selector_cache.record("search_box", name, order[:n])
+            metrics.fallback(driver, f"search_box:{name}")
+            return found[0]
+        logging.info(f"  Search box strategy '{name}' found nothing. Trying next...")
+
+    # Nothing matched yet: the page may still be loading, keep polling every strategy
+    def any_strategy():
+        for name in order:
+            found = SEARCH_BOX_STRATEGIES[name](driver)
+            if found:
+                return name, found[0]
+        return None
+
+    hit = wait_for(any_strategy, SEARCH_BOX_TIMEOUT - SEARCH_BOX_SHORT_TIMEOUT)
+    if not hit:
+        raise Exception("Search box element could not be found with any selector.")
+    name, element = hit
+    selector_cache.record("search_box", name, order[:order.index(name)])
+    metrics.fallback(driver, f"search_box:{name}")
+    return element
+
+def find_result_items(driver, learn=True):
+    """
+    Return the result item elements currently loaded in the sidebar.
+    Strategies are tried in the order learned by selector_cache.py.
+    :param learn: record the winning strategy (harvest_results does this once per query).
+    """
+    order = selector_cache.ordered("items")
+    for n, name in enumerate(order):
         try:
-             search_box_input = wait.until(EC.presence_of_element_located((By.ID, "searchboxinput")))
+            items = ITEM_STRATEGIES[name](driver)
+        except Exception:
+            items = []
+        if items:
+            if learn:
+                selector_cache.record("items", name, order[:n])
+                metrics.fallback(driver, f"items:{name}")
+            return items
+    return []
+
+def extract_item(item):
+    """
+    Return (name, link) for one result item element.
+    """
+    link = item.get_attribute('href')
+    name = item.get_attribute('aria-label')
+    
+    # If item is a div (no href), look for 'a' tag inside
+    if not link:
+        try:
+            # Common pattern: The main link often has class 'hfpxzc' or is just the first 'a'
+            link_el = item.find_element(By.CSS_SELECTOR, "a")
+            link = link_el.get_attribute('href')
         except:
-             logging.info("  ID 'searchboxinput' not found. Trying fallback selectors...")
+            pass
 
-        # Fallback 1: Input with name="q"
-        if not search_box_input:
+    if not name:
+         # Try finding aria-label on the link element if missing on wrapper
+         if link:
              try:
-                 search_box_input = driver.find_element(By.NAME, "q")
-             except:
-                 pass
-        
-        # Fallback 2: Any visible input
-        if not search_box_input:
-             try:
-                 inputs = driver.find_elements(By.TAG_NAME, "input")
-                 for i in inputs:
-                     if i.is_displayed():
-                         search_box_input = i
-                         break
+                 # Re-find the element that gave us the link to check its aria-label
+                 # Or just search broadly for aria-label inside
+                 name = item.find_element(By.CSS_SELECTOR, "[aria-label]").get_attribute("aria-label")
              except:
                  pass
+    
+    # Fallback for name
+    if not name:
+        name = "Unknown Details" 
+    return name, link
 
-        if not search_box_input:
-            raise Exception("Search box element could not be found with any selector.")
+def extract_items_bulk(driver, start=0, learn=True):
+    """
+    Extract all result items from index `start` in one execute_script call.
+    Same selector fallbacks and name/link rules as find_result_items/extract_item,
+    but done in-page, so the cost is one round trip instead of several per item.
+    :param learn: record the winning strategy (see find_result_items).
+    Returns (total_items, [(name, link), ...]).
+    """
+    data = driver.execute_script(BULK_EXTRACT_JS, start, selector_cache.ordered("items")) or {}
+    if learn and data.get("method"):
+        selector_cache.record("items", data["method"], data.get("failed", []))
+        metrics.fallback(driver, f"items:{data['method']}")
+    pairs = []
+    for row in data.get("items", []):
+        link = row.get("href") or row.get("nestedHref")
+        name = row.get("label")
+        if not name and link:
+            name = row.get("nestedLabel")
+        pairs.append((name or "Unknown Details", link))
+    return data.get("total", 0), pairs
 
-        logging.info("Step 5: Found search box. Entering query...")
-        search_box_input.send_keys(search_query)
-        search_box_input.send_keys(Keys.ENTER)
-        
-        logging.info("Step 6: Searching... waiting for results...")
-        time.sleep(7) # Wait for initial load (increased)
+def _element_entries(items):
+    """Yield (name, link) per element, skipping items that raise."""
+    for item in items:
+        try:
+            yield extract_item(item)
+        except Exception as item_err:
+            logging.warning(f"  Item error: {item_err}")
 
-        logging.info("Step 7: Scrolling to load more results...")
-        # Attempt to scroll a few times to load results
-        for i in range(3): 
-            scroll_sidebar(driver)
-            logging.info(f"  Scroll {i+1}/3 complete")
-        
-        # Updated Selection Logic (2026/01)
-        # Strategy: Look for the main feed, then find all direct child divs that look like results
-        # Common structure: An article or a div with an aria-label (which is the business name)
-        
-        # Try multiple selectors
-        items = []
-        
-        # Method 1: 'article' role (cleanest if available)
-        items = driver.find_elements(By.CSS_SELECTOR, "div[role='article']")
-        
-        # Method 2: Class 'hfpxzc' (Link overlay, very common in 2024-2025)
-        if not items:
-             items = driver.find_elements(By.CLASS_NAME, "hfpxzc")
+def harvest_results(driver, search_query, max_results=20, max_scrolls=MAX_SCROLLS,
+                    plateau_scrolls=PLATEAU_SCROLLS, extraction=EXTRACTION_MODE):
+    """
+    Generator: extract new feed items after each scroll and yield them as lead dicts.
+    Stops when `max_results` leads were yielded, the end-of-list marker is shown,
+    the list stops growing for `plateau_scrolls` scrolls, or `max_scrolls` is hit.
+    :param extraction: "bulk" (one execute_script per pass) or "element"
+                       (WebDriver calls per item).
+    """
+    seen_links = set()
+    processed = 0   # items before this index were handled in an earlier pass
+    count = 0
+    idle_scrolls = 0
+    # Item strategy stats count queries, like the search box: learn on the first pass that finds items
+    learned = False
 
-        # Method 3: Fallback - Look for any link with /maps/place/ in href inside the feed
-        if not items:
-            try:
-                feed = driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
-                items = feed.find_elements(By.XPATH, ".//a[contains(@href, '/maps/place/')]")
-            except:
-                pass
+    for scroll in range(max_scrolls + 1):
+        first_index = processed
+        with metrics.stage(driver, "extract"):
+            if extraction == "bulk":
+                processed, entries = extract_items_bulk(driver, processed, learn=not learned)
+            else:
+                items = find_result_items(driver, learn=not learned)
+                entries = list(_element_entries(items[processed:]))
+                processed = len(items)
+        learned = learned or processed > 0
+        metrics.count(driver, "items_seen", len(entries))
+        found_before = count
+
+        for i, (name, link) in enumerate(entries, start=first_index):
+            if count >= max_results:
+                return
+            # Debug logging for first few items
+            if i < 3:
+                logging.info(f"  Item {i}: Link={bool(link)}, Name={name}")
+
+            if link and link not in seen_links:
+                seen_links.add(link)
+                count += 1
+                metrics.count(driver, "items_kept")
+                yield {
+                    "Name": name,
+                    "Search Query": search_query,
+                    "Link": link
+                }
+
+        if count >= max_results:
+            return
 
-        logging.info(f"Found {len(items)} potential items on loaded view. Processing...")
+        idle_scrolls = idle_scrolls + 1 if count == found_before else 0
+        state = feed_activity(driver)
+        if not state:
+            return  # No feed to scroll (e.g. the query opened a single place page)
+        if state[2]:
+            logging.info(f"  End of list reached after {scroll} scrolls ({count} leads)")
+            return
+        if idle_scrolls > plateau_scrolls:
+            logging.info(f"  No new items after {plateau_scrolls} scrolls, stopping ({count} leads)")
+            return
+        if scroll == max_scrolls:
+            return
+        with metrics.stage(driver, "scroll"):
+            scrolled = scroll_sidebar(driver)
+        if not scrolled:
+            return
+        logging.info(f"  Scroll {scroll + 1} complete ({count} leads so far)")
 
-        count = 0
-        seen_links = set()
+def iter_query(driver, keyword, area, max_results=20, extraction=EXTRACTION_MODE):
+    """
+    Run one search in an already opened Maps session and yield results
+    while scrolling continues. The search box is cleared first, so this
+    can be called repeatedly on the same driver (see scrape_batch).
+    """
+    search_query = f"{area} {keyword}"
+    metrics.start_query(driver, search_query)
+    ok = False
+    try:
+        with metrics.stage(driver, "search"):
+            search_box_input = find_search_box(driver)
+
+            logging.info("Step 5: Found search box. Entering query...")
+            previous_url = driver.current_url
+            previous_href = mark_previous_results(driver)
+            # Clear the previous query (batch mode reuses the same page)
+            search_box_input.send_keys(Keys.CONTROL, "a")
+            search_box_input.send_keys(Keys.DELETE)
+            search_box_input.send_keys(search_query)
+            search_box_input.send_keys(Keys.ENTER)
         
-        for i, item in enumerate(items):
-            if count >= max_results:
-                break
-                
-            try:
-                # Debug logging for first few items
-                link = item.get_attribute('href')
-                name = item.get_attribute('aria-label')
-                
-                # If item is a div (no href), look for 'a' tag inside
-                if not link:
-                    try:
-                        # Common pattern: The main link often has class 'hfpxzc' or is just the first 'a'
-                        link_el = item.find_element(By.CSS_SELECTOR, "a")
-                        link = link_el.get_attribute('href')
-                    except:
-                        pass
-                
-                if i < 3: 
-                    logging.info(f"  Item {i}: Link={bool(link)}, Name={name}")
-
-                if not name:
-                     # Try finding aria-label on the link element if missing on wrapper
-                     if link:
-                         try:
-                             # Re-find the element that gave us the link to check its aria-label
-                             # Or just search broadly for aria-label inside
-                             name = item.find_element(By.CSS_SELECTOR, "[aria-label]").get_attribute("aria-label")
-                         except:
-                             pass
-                
-                # Fallback for name
-                if not name:
-                    name = "Unknown Details" 
-
-                if link and link not in seen_links:
-                    seen_links.add(link)
-                    data = {
-                        "Name": name,
-                        "Search Query": search_query,
-                        "Link": link
-                    }
-                    results.append(data)
-                    count += 1
-            except Exception as item_err:
-                logging.warning(f"  Item error: {item_err}")
-                continue
+        logging.info("Step 6: Searching... waiting for results...")
+        with metrics.stage(driver, "wait"):
+            # In batch mode the previous feed is still on screen, so wait for navigation first
+            wait_for_url_change(driver, previous_url)
+            # ...and for the list itself to be swapped: the URL may change before the new results arrive
+            replaced = wait_for_results_replaced(driver, previous_href) if previous_href else None
+            if previous_href and not replaced:
+                raise Exception("Results of the previous query are still shown")
+            if replaced != "no_results" and wait_for_results(driver) == "feed":
+                wait_for_feed_settled(driver)
 
-    except Exception as e:
-        logging.error(f"An error occurred: {e}")
+        if replaced == "no_results":
+            # A valid outcome (empty grid cell): the job is done with 0 leads
+            logging.info("Step 7: Maps found no results for this query.")
+        else:
+            logging.info("Step 7: Collecting results while scrolling...")
+            yield from harvest_results(driver, search_query, max_results, extraction=extraction)
+        ok = True
     finally:
-        driver.quit()
+        metrics.finish_query(driver, ok)
+        selector_cache.save()
 
-    # Save
+def run_query(driver, keyword, area, max_results=20, extraction=EXTRACTION_MODE):
+    """
+    Run one search and return all results as a list (see iter_query).
+    """
+    results = list(iter_query(driver, keyword, area, max_results, extraction))
+    logging.info(f"Collected {len(results)} leads for '{area} {keyword}'")
+    return results
+
+def save_results(results, filename=None, fmt=None):
+    """
+    Save collected leads (Excel by default; CSV / JSONL / Parquet by extension
+    or `fmt`, see exporters.py).
+    """
     if results:
-        df = pd.DataFrame(results)
         # Ensure output directory exists (current dir)
-        filename = f"leads_{int(time.time())}.xlsx"
-        df.to_excel(filename, index=False)
+        filename = filename or f"leads_{int(time.time())}.{fmt or 'xlsx'}"
+        present = set().union(*results)
+        columns = [c for c in LEAD_COLUMNS if c in present] + sorted(present - set(LEAD_COLUMNS))
+        exporters.export(results, filename, fmt=fmt, columns=columns)
         logging.info(f"Saved {len(results)} leads to {filename}")
     else:
         logging.info("No results found or extraction failed (selectors might need update).")
 
-if __name__ == "__main__":
-    print("--- Google Maps Scraper ---")
-    kwd = input("Enter Keyword (e.g., Cafe): ") or "Cafe"
-    loc = input("Enter Area (e.g., Shinjuku, Tokyo): ") or "Shinjuku"
-    
-    # Headless prompt
-    hl_input = input("Run in Headless mode? (y/n, default n): ").lower()
-    use_headless = hl_input == 'y'
+def store_in_db(db_path, results):
+    """
+    Upsert a finished run's leads into the persistent lead database.
+    Returns the number of leads that were not known before.
+    """
+    conn = lead_db.connect(db_path)
+    run_id = lead_db.begin_run(conn)
+    new_count = sum(lead_db.upsert_lead(conn, lead, run_id) for lead in results)
+    for lead in results:
+        lead_db.update_details(conn, lead)
+    lead_db.finish_run(conn, run_id)
+    conn.close()
+    logging.info(f"Lead DB {db_path}: {new_count} new of {len(results)} leads")
+    return new_count
+
+def enrich_results(results, headless=False, workers=enrich.DEFAULT_WORKERS,
+                   min_interval=enrich.DEFAULT_MIN_INTERVAL, lean=False):
+    """
+    Add Phone / Address to results by visiting each place page (see enrich.py).
+    """
+    return enrich.enrich_leads(results, lambda: setup_driver(headless=headless, lean=lean),
+                               workers=workers, min_interval=min_interval)
+
+def scrape_google_maps(keyword, area, max_results=20, headless=False, extraction=EXTRACTION_MODE,
+                       db_path=None, enrich_workers=0, lean=False, output=None, fmt=None):
+    """
+    Main scraping function.
+    If `db_path` is given, leads are also upserted into the lead database.
+    If `enrich_workers` > 0, Phone / Address are fetched from each place page.
+    """
+    search_query = f"{area} {keyword}"
+    logging.info(f"Starting scrape for: {search_query}")
     
-    scrape_google_maps(kwd, loc, headless=use_headless)
+    driver = setup_driver(headless=headless, lean=lean)
+    results = []
+
+    try:
+        open_maps(driver)
+        results = run_query(driver, keyword, area, max_results, extraction)
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+    finally:
+        driver.quit()
+
+    if enrich_workers and results:
+        enrich_results(results, headless=headless, workers=enrich_workers, lean=lean)
+
+    # Save
+    save_results(results, output, fmt)
+    if db_path and results:
+        store_in_db(db_path, results)
+
+def load_jobs(path):
+    """
+    Load search jobs from a CSV or JSONL file.
+    Each job needs 'keyword' and 'area'; 'max_results' is optional.
+
+    CSV:   keyword,area,max_results
+           Cafe,Shinjuku,20
+    JSONL: {"keyword": "Cafe", "area": "Shinjuku", "max_results": 20}
+    """
+    jobs = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".json")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    for row in rows:
+        keyword = (row.get("keyword") or "").strip()
+        area = (row.get("area") or "").strip()
+        if not keyword or not area:
+            logging.warning(f"Skipping job without keyword/area: {row}")
+            continue
+        jobs.append({
+            "keyword": keyword,
+            "area": area,
+            "max_results": int(row.get("max_results") or DEFAULT_MAX_RESULTS),
+        })
+    return jobs
+
+def get_browser_memory_mb(driver):
+    """
+    Return the JS heap size of the current page in MB (0 if unavailable).
+    Used as a cheap signal that a long-lived session has grown too large.
+    """
+    try:
+        used = driver.execute_script(
+            "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0;"
+        )
+        return (used or 0) / (1024 * 1024)
+    except Exception:
+        return 0
+
+def get_chrome_rss_mb(driver):
+    """
+    Resident memory of chromedriver and all Chrome processes it started, in MB.
+    Needs the optional `psutil` package; returns None without it.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except Exception:
+        return None
+
+def session_memory_mb(driver):
+    """
+    Memory of a browser session for the recycle check, as (MB, what was measured).
+    Chrome process RSS when psutil is installed (the renderer / GPU / browser
+    processes are what grows in a long session), else the page's JS heap.
+    """
+    rss = get_chrome_rss_mb(driver)
+    if rss is not None:
+        return rss, "Chrome RSS"
+    return get_browser_memory_mb(driver), "page JS heap"
+
+def measure_profile(keyword, area, lean, headless=True, max_results=20):
+    """
+    Run one query with the normal or lean profile and return load time,
+    transferred bytes and memory figures.
+    """
+    started = time.perf_counter()
+    driver = setup_driver(headless=headless, lean=lean)
+    try:
+        load_started = time.perf_counter()
+        open_maps(driver)
+        page_load = time.perf_counter() - load_started
+        results = run_query(driver, keyword, area, max_results)
+        transferred = driver.execute_script(
+            "return performance.getEntries().reduce((sum, e) => sum + (e.transferSize || 0), 0);"
+        ) or 0
+        return {
+            "profile": "lean" if lean else "normal",
+            "page_load_s": round(page_load, 2),
+            "total_s": round(time.perf_counter() - started, 2),
+            "leads": len(results),
+            "transferred_mb": round(transferred / (1024 * 1024), 1),
+            "js_heap_mb": round(get_browser_memory_mb(driver), 1),
+            "chrome_rss_mb": round(get_chrome_rss_mb(driver) or 0, 1) or None,
+        }
+    finally:
+        driver.quit()
+
+def compare_profiles(keyword="Cafe", area="Shinjuku", headless=True):
+    """
+    Run the same query with the normal and lean profiles and print what lean saves.
+    """
+    rows = [measure_profile(keyword, area, lean=False, headless=headless),
+            measure_profile(keyword, area, lean=True, headless=headless)]
+    normal, lean = rows
+    print("--- Normal vs Lean profile ---")
+    for key in ("page_load_s", "total_s", "leads", "transferred_mb", "js_heap_mb", "chrome_rss_mb"):
+        a, b = normal[key], lean[key]
+        saved = f"{a - b:+.1f} saved" if isinstance(a, (int, float)) and isinstance(b, (int, float)) else ""
+        print(f"  {key:<15} normal={a!s:<8} lean={b!s:<8} {saved}")
+    if normal["chrome_rss_mb"] is None:
+        print("  (pip install psutil to measure Chrome process memory)")
+    return rows
+
+def run_jobs(jobs, run, headless=False, recycle_every=50, max_memory_mb=1024, extraction=EXTRACTION_MODE,
+             conn=None, db_run_id=None, before_query=None, lean=False):
+    """
+    Run jobs in one long-lived browser, checkpointing every lead into `run`
+    (see checkpoint.open_run). Chrome is started once and reused via the
+    search box. The driver is recycled after `recycle_every` queries or when
+    its memory grows above `max_memory_mb` (Chrome RSS with psutil, else the
+    page JS heap, see session_memory_mb), and after any query that fails.
+    :param conn: optional lead database connection to upsert leads into.
+    :param before_query: optional callable run before each query (e.g. pacing).
+    Returns stats: {"queries", "failed", "leads", "new_in_db", "driver_starts", "seconds"}.
+    """
+    stats = {"queries": 0, "failed": 0, "leads": 0, "new_in_db": 0, "driver_starts": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    driver = None
+    queries_on_driver = 0
+
+    try:
+        for n, job in enumerate(jobs, 1):
+            if driver is not None:
+                memory_mb, measured = session_memory_mb(driver)
+                if queries_on_driver >= recycle_every or memory_mb > max_memory_mb:
+                    logging.info(f"Recycling driver after {queries_on_driver} queries ({memory_mb:.0f} MB {measured})")
+                    driver.quit()
+                    driver = None
+
+            if driver is None:
+                driver = setup_driver(headless=headless, lean=lean)
+                stats["driver_starts"] += 1
+                queries_on_driver = 0
+                try:
+                    open_maps(driver)
+                except Exception as e:
+                    logging.error(f"Could not open Google Maps: {e}")
+                    stats["failed"] += 1
+                    driver.quit()
+                    driver = None
+                    continue
+
+            if before_query:
+                before_query()
+            logging.info(f"[{n}/{len(jobs)}] {job['area']} {job['keyword']}")
+            stats["queries"] += 1
+            try:
+                job_count = 0
+                for lead in iter_query(driver, job["keyword"], job["area"], job["max_results"], extraction):
+                    checkpoint.record_lead(run, lead)
+                    if conn:
+                        stats["new_in_db"] += lead_db.upsert_lead(conn, lead, db_run_id)
+                    job_count += 1
+                if conn:
+                    conn.commit()
+                checkpoint.mark_job_done(run, job, job_count)
+                stats["leads"] += job_count
+                logging.info(f"  -> {job_count} leads (total {len(run['seen_leads'])})")
+            except Exception as e:
+                logging.error(f"Query failed: {e}")
+                stats["failed"] += 1
+                # The session may be in a bad state; start fresh for the next job
+                driver.quit()
+                driver = None
+            queries_on_driver += 1
+    finally:
+        if driver is not None:
+            driver.quit()
+        stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+def scrape_batch(jobs_path, headless=False, recycle_every=50, max_memory_mb=1024, output=None,
+                 extraction=EXTRACTION_MODE, run_dir=None, db_path=None, enrich_workers=0, lean=False, fmt=None):
+    """
+    Run many (keyword, area, max_results) jobs in one long-lived browser (see run_jobs).
+
+    Every lead is appended to `run_dir`/leads.jsonl as soon as it is found
+    and finished jobs are journaled (see checkpoint.py). Running the same
+    batch again skips finished jobs. The combined Excel file is written
+    from the stored leads at the end. If `db_path` is given, each lead is
+    also upserted into the persistent lead database (see lead_db.py).
+    If `enrich_workers` > 0, Phone / Address are fetched for all stored
+    leads before saving.
+    """
+    jobs = load_jobs(jobs_path)
+    run_dir = run_dir or os.path.splitext(jobs_path)[0] + "_run"
+    run = checkpoint.open_run(run_dir)
+    pending = [job for job in jobs if checkpoint.job_key(job) not in run["done_jobs"]]
+    logging.info(f"Loaded {len(jobs)} jobs from {jobs_path} ({len(jobs) - len(pending)} already done, run dir: {run_dir})")
+
+    conn = lead_db.connect(db_path) if db_path else None
+    db_run_id = lead_db.begin_run(conn) if conn else None
+    try:
+        stats = run_jobs(pending, run, headless=headless, recycle_every=recycle_every,
+                         max_memory_mb=max_memory_mb, extraction=extraction, conn=conn, db_run_id=db_run_id,
+                         lean=lean)
+        logging.info(f"Batch stats: {stats}")
+    finally:
+        if conn:
+            lead_db.finish_run(conn, db_run_id)
+            conn.close()
+
+    results = checkpoint.load_leads(run)
+    finish_results(results, output, headless=headless, db_path=db_path, enrich_workers=enrich_workers, lean=lean,
+                   fmt=fmt)
+    return results
+
+def finish_results(results, output=None, headless=False, db_path=None, enrich_workers=0, lean=False, fmt=None):
+    """
+    Optional enrichment (stored back into the lead database) and final save.
+    """
+    if enrich_workers and results:
+        enrich_results(results, headless=headless, workers=enrich_workers, lean=lean)
+        if db_path:
+            conn = lead_db.connect(db_path)
+            for lead in results:
+                lead_db.update_details(conn, lead)
+            conn.commit()
+            conn.close()
+    save_results(results, output, fmt)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Google Maps Scraper")
+    parser.add_argument("--batch", help="CSV/JSONL file of keyword,area,max_results jobs")
+    parser.add_argument("--output", help="Output file (.xlsx / .csv / .jsonl / .parquet)")
+    parser.add_argument("--format", choices=exporters.FORMATS, help="Output format (default: from --output, else xlsx)")
+    parser.add_argument("--run-dir", help="Checkpoint directory for resuming (batch mode, default: <jobs>_run)")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome in headless mode")
+    parser.add_argument("--db", help="SQLite lead database for cross-run dedup (see lead_db.py)")
+    parser.add_argument("--enrich", type=int, default=0, metavar="N",
+                        help="Fetch Phone/Address from place pages with N parallel browsers")
+    parser.add_argument("--recycle-every", type=int, default=50, help="Restart Chrome after N queries (batch mode)")
+    parser.add_argument("--max-memory-mb", type=int, default=1024,
+                        help="Restart Chrome above this many MB: Chrome process RSS if psutil is installed, "
+                             "else the page JS heap (batch mode)")
+    parser.add_argument("--extraction", choices=["bulk", "element"], default=EXTRACTION_MODE,
+                        help="bulk = one execute_script per pass, element = WebDriver calls per item")
+    parser.add_argument("--lean", action="store_true",
+                        help="Block images, fonts, media and map tiles; use new headless mode")
+    parser.add_argument("--compare-lean", action="store_true",
+                        help="Run one query with the normal and lean profiles and report the savings")
+    parser.add_argument("--metrics-file", help="Append one JSON metrics record per query to this file")
+    parser.add_argument("--prom-file", help="Write Prometheus textfile metrics (node_exporter textfile collector)")
+    args = parser.parse_args()
+
+    metrics.configure(jsonl_path=args.metrics_file, prom_path=args.prom_file)
+
+    if args.compare_lean:
+        compare_profiles(headless=args.headless)
+    elif args.batch:
+        scrape_batch(args.batch, headless=args.headless, recycle_every=args.recycle_every,
+                     max_memory_mb=args.max_memory_mb, output=args.output, extraction=args.extraction,
+                     run_dir=args.run_dir, db_path=args.db, enrich_workers=args.enrich, lean=args.lean,
+                     fmt=args.format)
+    else:
+        print("--- Google Maps Scraper ---")
+        kwd = input("Enter Keyword (e.g., Cafe): ") or "Cafe"
+        loc = input("Enter Area (e.g., Shinjuku, Tokyo): ") or "Shinjuku"
+        
+        # Headless prompt
+        use_headless = args.headless
+        if not use_headless:
+            hl_input = input("Run in Headless mode? (y/n, default n): ").lower()
+            use_headless = hl_input == 'y'
+        
+        scrape_google_maps(kwd, loc, headless=use_headless, extraction=args.extraction, db_path=args.db,
+                           enrich_workers=args.enrich, lean=args.lean, output=args.output, fmt=args.format)
@@ -0,0 +1,123 @@
+"""
+Self-learning selector strategy cache.
+======================================
+The scraper has fallback chains for the search box and for result items.
+This module keeps hit/miss counts per strategy (persisted as JSON next
+to the chromedriver cache), tries the best one first, and demotes
+strategies that stop matching; the last winner breaks ties. Catch-all
+strategies (any visible input, any place link) always come after the
+specific selectors. Hit/miss counts per strategy show when Google's
+markup drifts.
+
+Only successful lookups update the cache: the winning strategy gets a hit
+and every strategy tried before it gets a miss. A lookup where nothing
+matches (e.g. page not loaded yet) teaches nothing.
+
+Usage:
+    python selector_cache.py --stats
+    python selector_cache.py --reset
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Shared cache directory lives in <repo>/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from utils.driver_factory import CACHE_DIR
+
+CACHE_FILE = os.path.join(CACHE_DIR, "maps_selectors.json")
+
+# Default order = the original hand-written fallback chains
+DEFAULT_ORDER = {
+    "search_box": ["id", "name_q", "visible_input"],
+    "items": ["article", "hfpxzc", "place_link"],
+}
+
+# Broad fallbacks that match almost any page: always tried after the specific
+# selectors, otherwise one lucky win would stop the precise ones from being retried
+CATCH_ALL = {"visible_input", "place_link"}
+
+_state = {"data": None, "dirty": False}
+
+def _load():
+    if _state["data"] is None:
+        try:
+            with open(CACHE_FILE, encoding="utf-8") as f:
+                _state["data"] = json.load(f)
+        except (OSError, ValueError):
+            _state["data"] = {}
+    return _state["data"]
+
+def _group(name):
+    data = _load()
+    group = data.setdefault(name, {"last": None, "stats": {}})
+    for strategy in DEFAULT_ORDER[name]:
+        group["stats"].setdefault(strategy, {"hits": 0, "misses": 0})
+    return group
+
+def ordered(name):
+    """
+    Strategies of group `name`, best first: specific selectors before the
+    catch-all ones, each by hit rate, with the last winner breaking ties,
+    then in the default order.
+    """
+    group = _group(name)
+    defaults = DEFAULT_ORDER[name]
+
+    def rank(strategy):
+        s = group["stats"][strategy]
+        tried = s["hits"] + s["misses"]
+        rate = s["hits"] / tried if tried else 0.5
+        return (strategy in CATCH_ALL, -rate, strategy != group["last"], defaults.index(strategy))
+
+    return sorted(defaults, key=rank)
+
+def record(name, winner, tried_before=()):
+    """The `winner` strategy matched after `tried_before` strategies failed."""
+    group = _group(name)
+    group["stats"][winner]["hits"] += 1
+    for strategy in tried_before:
+        group["stats"][strategy]["misses"] += 1
+    if tried_before or group["last"] != winner:
+        logging.info(f"  Selector cache: '{name}' now prefers '{winner}' (failed: {list(tried_before)})")
+    group["last"] = winner
+    _state["dirty"] = True
+
+def save():
+    """Persist the cache if it changed (atomic rename, safe with several processes)."""
+    if not _state["dirty"]:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_state["data"], f, indent=2)
+    os.replace(tmp_path, CACHE_FILE)
+    _state["dirty"] = False
+
+def stats():
+    """Hit rate per strategy: {group: {strategy: {"hits", "misses", "hit_rate"}}}."""
+    report = {}
+    for name in DEFAULT_ORDER:
+        group = _group(name)
+        report[name] = {"last": group["last"], "order": ordered(name)}
+        for strategy, s in group["stats"].items():
+            tried = s["hits"] + s["misses"]
+            report[name][strategy] = {**s, "hit_rate": round(s["hits"] / tried, 3) if tried else None}
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maps selector strategy cache")
+    parser.add_argument("--stats", action="store_true", help="Show hit rates per strategy")
+    parser.add_argument("--reset", action="store_true", help="Forget learned strategies")
+    args = parser.parse_args()
+
+    if args.reset:
+        if os.path.exists(CACHE_FILE):
+            os.remove(CACHE_FILE)
+        print(f"Removed {CACHE_FILE}")
+    else:
+        print(f"Cache file: {CACHE_FILE}")
+        print(json.dumps(stats(), indent=2))
@@ -0,0 +1,198 @@
+"""
+Condition-driven waits for the Google Maps scraper.
+====================================================
+Replaces fixed time.sleep() calls with waits that return as soon as the
+page is ready. Each wait has an upper bound (see WAIT_TIMEOUTS) so a slow
+page behaves like before, while a fast page does not pay the full delay.
+
+Result list activity is tracked with a MutationObserver injected into the
+feed via execute_script, so "stopped growing" means no DOM changes for
+QUIET_PERIOD seconds rather than a guessed sleep.
+"""
+
+import time
+import logging
+from selenium.webdriver.common.by import By
+
+# Upper bounds in seconds (the old fixed sleeps were 3 / 2 / 7 / 2)
+WAIT_TIMEOUTS = {
+    "consent": 3,     # consent popup or search box to appear
+    "dismiss": 2,     # consent popup to disappear after click
+    "results": 10,    # results feed (or a single place page) to appear
+    "settle": 7,      # feed to stop changing after a search
+    "scroll": 4,      # new items to load after a scroll
+}
+POLL_INTERVAL = 0.1
+QUIET_PERIOD = 0.6   # no feed mutations for this long = settled
+
+FEED_SELECTOR = "div[role='feed']"
+CONSENT_XPATH = "//button[contains(., 'すべて同意') or contains(., 'Accept all') or contains(., '同意')]"
+
+# Installs (once per feed element) a MutationObserver that records the time
+# of the last change, and returns [item_count, ms_since_last_change].
+FEED_ACTIVITY_JS = """
+const feed = document.querySelector("div[role='feed']");
+if (!feed) return null;
+let state = window.__leadsFeedWatch;
+if (!state || state.feed !== feed) {
+    if (state && state.observer) state.observer.disconnect();
+    state = {feed: feed, last: Date.now()};
+    state.observer = new MutationObserver(() => { state.last = Date.now(); });
+    state.observer.observe(feed, {childList: true, subtree: true});
+    window.__leadsFeedWatch = state;
+}
+const count = feed.querySelectorAll("a[href*='/maps/place/']").length;
+const endOfList = !!feed.querySelector("span.HlvSq");
+return [count, Date.now() - state.last, endOfList];
+"""
+
+# Messages Maps shows in the side panel when a search matches nothing
+NO_RESULTS_TEXTS = ["見つかりませんでした", "見つかりません", "can't find", "No results"]
+
+# Remembers the first result of the current feed as the previous query's
+# and returns its href (null if there is no feed / result).
+MARK_RESULTS_JS = """
+const feed = document.querySelector("div[role='feed']");
+const link = feed && feed.querySelector("a[href*='/maps/place/']");
+window.__leadsPreviousResult = link || null;
+return link ? link.href : null;
+"""
+
+# "feed" once the first result is a new element with a different href,
+# "place" once a place page is shown and the old result is gone,
+# "no_results" when Maps says nothing was found, "cleared" once the old
+# result is detached without new ones yet, else null (previous results
+# are still shown).
+RESULTS_REPLACED_JS = """
+const previous = window.__leadsPreviousResult;
+const feed = document.querySelector("div[role='feed']");
+const link = feed && feed.querySelector("a[href*='/maps/place/']");
+if (link && link !== previous) return "feed";
+if (link && link.href !== arguments[0]) return "feed";
+const main = document.querySelector("div[role='main']");
+const text = main ? main.innerText || "" : "";
+if (arguments[1].some(t => text.includes(t))) return "no_results";
+if (previous && previous.isConnected) return null;
+return location.pathname.includes("/maps/place/") ? "place" : "cleared";
+"""
+
+def wait_for(condition, timeout, poll=POLL_INTERVAL):
+    """
+    Poll `condition()` until it returns a truthy value or `timeout` seconds pass.
+    Exceptions raised by the condition count as "not ready yet".
+    Returns the truthy value, or None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            value = condition()
+            if value:
+                return value
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
+
+def feed_activity(driver):
+    """Return (item_count, seconds_since_last_change, end_of_list) or None if no feed."""
+    state = driver.execute_script(FEED_ACTIVITY_JS)
+    if not state:
+        return None
+    count, quiet_ms, end_of_list = state
+    return count, quiet_ms / 1000.0, bool(end_of_list)
+
+def wait_for_consent_or_search(driver, timeout=None):
+    """
+    Wait until either the consent popup or the search box is on the page.
+    Returns the list of consent buttons (empty if the page went straight to Maps).
+    """
+    timeout = WAIT_TIMEOUTS["consent"] if timeout is None else timeout
+
+    def ready():
+        buttons = driver.find_elements(By.XPATH, CONSENT_XPATH)
+        if buttons:
+            return buttons
+        if driver.find_elements(By.ID, "searchboxinput"):
+            return [None]
+        return None
+
+    found = wait_for(ready, timeout) or []
+    return [b for b in found if b is not None]
+
+def wait_for_consent_gone(driver, timeout=None):
+    """Wait until no consent button is left on the page."""
+    timeout = WAIT_TIMEOUTS["dismiss"] if timeout is None else timeout
+    return bool(wait_for(lambda: not driver.find_elements(By.XPATH, CONSENT_XPATH), timeout))
+
+def wait_for_url_change(driver, old_url, timeout=None):
+    """Wait until the page URL differs from `old_url` (a new search was issued)."""
+    timeout = WAIT_TIMEOUTS["results"] if timeout is None else timeout
+    return bool(wait_for(lambda: driver.current_url != old_url, timeout))
+
+def mark_previous_results(driver):
+    """
+    Remember the first result currently in the feed (batch mode: the
+    previous query's). Returns its href, or None if there are no results on screen.
+    """
+    try:
+        return driver.execute_script(MARK_RESULTS_JS)
+    except Exception:
+        return None
+
+def wait_for_results_replaced(driver, previous_href, timeout=None):
+    """
+    Wait until the results marked by mark_previous_results() are gone: the
+    first result is a new element with another href, a place page opened,
+    Maps shows its no-results message, or the old result was removed from
+    the page. The URL can change before Maps swaps the list, so this is the
+    real "new results are on screen" signal.
+    Returns "feed", "place", "no_results" or "cleared", or None on timeout
+    (the marked result is still on the page).
+    """
+    timeout = WAIT_TIMEOUTS["results"] if timeout is None else timeout
+    return wait_for(lambda: driver.execute_script(RESULTS_REPLACED_JS, previous_href, NO_RESULTS_TEXTS), timeout)
+
+def wait_for_results(driver, timeout=None):
+    """
+    Wait for the results feed to appear. A query that matches one exact
+    business opens the place page directly instead, which also counts.
+    Returns "feed", "place" or None on timeout.
+    """
+    timeout = WAIT_TIMEOUTS["results"] if timeout is None else timeout
+
+    def ready():
+        if driver.find_elements(By.CSS_SELECTOR, FEED_SELECTOR):
+            return "feed"
+        if "/maps/place/" in driver.current_url:
+            return "place"
+        return None
+
+    return wait_for(ready, timeout)
+
+def wait_for_feed_settled(driver, min_count=0, timeout=None, quiet=QUIET_PERIOD):
+    """
+    Wait until the feed holds more than `min_count` items and has not changed
+    for `quiet` seconds, or the end-of-list marker is shown.
+    Returns the final (count, end_of_list), or the last seen state on timeout.
+    """
+    timeout = WAIT_TIMEOUTS["settle"] if timeout is None else timeout
+    last = [(min_count, False)]
+
+    def settled():
+        state = feed_activity(driver)
+        if not state:
+            return None
+        count, quiet_for, end_of_list = state
+        last[0] = (count, end_of_list)
+        if end_of_list:
+            return last[0]
+        if count > min_count and quiet_for >= quiet:
+            return last[0]
+        return None
+
+    result = wait_for(settled, timeout)
+    if result is None:
+        logging.debug(f"Feed did not settle within {timeout}s (last state {last[0]})")
+        return last[0]
+    return result
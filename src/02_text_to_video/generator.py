@@ -2,79 +2,367 @@
 Text-to-Video Generator
 =======================
 Wrapper script to generate videos using Remotion.
+
+Finished renders are cached by composition + props + Remotion sources
+(see render_cache.py), so regenerating an identical clip is a file copy.
+
+Batch mode bundles the Remotion project once and renders every row of a
+JSONL/CSV file (columns: text, bg, title_color, vertical, output) with one
+shared browser (remotion_app/render_batch.mjs).
+
+Usage:
+    python generator.py --text "Hello\\nWorld" --vertical
+    python generator.py --props_file props.json --no-cache
+    python generator.py --batch videos.csv --out-dir videos
+    python generator.py --text "$(cat script.txt)" --vertical --segments 4
+    python generator.py --text "Sale" --preset draft
+    python generator.py --bench-presets
 """
 
 import os
+import re
+import csv
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
 import sys
 import shutil
 
+import presets
+import render_cache
+from render_progress import run_remotion, print_event
+
 # Path to the inner Remotion app
 REMOTION_APP_DIR = os.path.join(os.path.dirname(__file__), "remotion_app")
 INPUT_JSON_PATH = os.path.join(REMOTION_APP_DIR, "input.json")
+BATCH_SCRIPT = "render_batch.mjs"
+DEFAULT_DURATION_FRAMES = 150  # same default as remotion_app/src/Root.tsx (5 seconds at 30fps)
+MIN_SEGMENT_FRAMES = 90  # 3 seconds at 30fps; shorter segments cost more in startup than they save
 
 def check_dependencies():
     """Check if node_modules exists, else prompt to install."""
     if not os.path.exists(os.path.join(REMOTION_APP_DIR, "node_modules")):
         print("⚠️  First time setup: Installing Node.js dependencies...")
         try:
-            subprocess.check_call(["npm", "install"], cwd=REMOTION_APP_DIR, shell=True)
+            subprocess.check_call([shutil.which("npm") or "npm", "install"], cwd=REMOTION_APP_DIR)
             print("✅ Dependencies installed.")
-        except subprocess.CalledProcessError:
+        except (OSError, subprocess.CalledProcessError):
             print("❌ Error: Failed to install dependencies. Make sure Node.js is installed.")
             sys.exit(1)
 
-def generate_video(text, title_color="#333333", bg_color="#ffffff", is_vertical=False):
-    """
-    1. Write inputs to input.json
-    2. Run Remotion render
-    3. Move output
-    """
-    check_dependencies()
-
-    # Prepare input props
-    input_data = {
-        "text": text,
-        "titleColor": title_color,
-        "bgColor": bg_color,
-        "durationInFrames": 150
-    }
-    
-    props_json = json.dumps(input_data)
-    
-    # Select composition based on format
+def build_job(text, title_color="#333333", bg_color="#ffffff", is_vertical=False):
+    """Return (composition id, input props) for one video."""
     # Select composition based on format
     if is_vertical:
         comp_id = "TerminalVertical" # Default to Terminal for now as it's the requested upgrade
     else:
         comp_id = "HelloWorld"
-        
-    output_filename = "output_vertical.mp4" if is_vertical else "output_horizontal.mp4"
-    
+
     # Calc duration based on text length (approx 10 chars per sec + buffer)
-    duration = max(150, len(text) * 2 + 60)
-    input_data["durationInFrames"] = duration
-    props_json = json.dumps(input_data)
+    input_data = {
+        "text": text,
+        "titleColor": title_color,
+        "bgColor": bg_color,
+        "durationInFrames": max(DEFAULT_DURATION_FRAMES, len(text) * 2 + 60)
+    }
+    return comp_id, input_data
 
-    output_path = os.path.join(os.getcwd(), output_filename)
+def _npx():
+    # Resolve npx.cmd on Windows so no shell is needed for parallel processes
+    return shutil.which("npx") or "npx"
 
-    print(f"🎬 Rendering video ({comp_id}) with text length: {len(text)}...")
-    
+def remotion_command(comp_id, output_path, props_arg, concurrency=None, extra=(), encoding=None):
+    """Argument list for `npx remotion render` (`encoding`: settings from presets.resolve)."""
     cmd = [
-        "npx", "remotion", "render",
+        _npx(), "remotion", "render",
         "src/index.ts",
         comp_id,
         output_path,
-        f"--props={props_json}",
+        f"--props={props_arg}",
         "--overwrite"
     ]
+    if concurrency:
+        cmd.append(f"--concurrency={concurrency}")
+    return cmd + presets.cli_args(encoding or {}) + list(extra)
+
+def plan_segments(frames, segments, min_frames=MIN_SEGMENT_FRAMES):
+    """Split frames 0..frames-1 into up to `segments` contiguous (start, end) ranges, inclusive."""
+    segments = max(1, min(segments, frames // min_frames))
+    size, rest = divmod(frames, segments)
+    ranges = []
+    start = 0
+    for k in range(segments):
+        end = start + size + (1 if k < rest else 0) - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
 
+def concat_segments(segment_paths, output_path):
+    """Join segment files with the ffmpeg concat demuxer (stream copy, no re-encode)."""
+    list_path = output_path + ".segments.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write("file '" + os.path.abspath(path).replace("'", "'\\''") + "'\n")
+    # Prefer a system ffmpeg, else the one that ships with Remotion
+    ffmpeg = [shutil.which("ffmpeg")] if shutil.which("ffmpeg") else [_npx(), "remotion", "ffmpeg"]
+    cmd = ffmpeg + ["-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy", "-movflags", "+faststart", output_path]
     try:
-        subprocess.check_call(cmd, cwd=REMOTION_APP_DIR, shell=True)
+        subprocess.check_call(cmd, cwd=REMOTION_APP_DIR)
+    finally:
+        os.remove(list_path)
+
+def render_single(comp_id, props, output_path, props_arg=None, concurrency=None, on_progress=print_event,
+                  progress_log=None, encoding=None):
+    """Render in one `remotion render` process. Returns the progress summary (see render_progress.py)."""
+    cmd = remotion_command(comp_id, output_path, props_arg or json.dumps(props), concurrency, encoding=encoding)
+    return run_remotion(cmd, REMOTION_APP_DIR, output_path, on_event=on_progress, log_path=progress_log)
+
+def render_segmented(comp_id, props, output_path, segments, props_arg=None, concurrency=None,
+                     on_progress=print_event, progress_log=None, encoding=None):
+    """
+    Render the frame range as `segments` parallel `--frames` renders, then
+    stream-copy concatenate them. Each segment gets cores / segments frame
+    concurrency unless `concurrency` is given. Progress events carry a
+    "segment" index. Returns True on success.
+    """
+    ranges = plan_segments(props.get("durationInFrames", DEFAULT_DURATION_FRAMES), segments)
+    if len(ranges) == 1:
+        return render_single(comp_id, props, output_path, props_arg, concurrency, on_progress, progress_log,
+                             encoding)["ok"]
+
+    concurrency = concurrency or max(1, (os.cpu_count() or 1) // len(ranges))
+    print(f"🧩 Rendering {len(ranges)} segments in parallel (concurrency {concurrency} each)...")
+    seg_dir = tempfile.mkdtemp(prefix="segments_", dir=os.path.dirname(os.path.abspath(output_path)))
+    seg_paths = [os.path.join(seg_dir, f"seg_{k:03d}.mp4") for k in range(len(ranges))]
+    try:
+        def render_one(k):
+            start, end = ranges[k]
+            cmd = remotion_command(comp_id, seg_paths[k], props_arg or json.dumps(props), concurrency,
+                                   extra=[f"--frames={start}-{end}"], encoding=encoding)
+            return run_remotion(cmd, REMOTION_APP_DIR, seg_paths[k], on_event=on_progress,
+                                log_path=progress_log, tags={"segment": k})
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            results = list(pool.map(render_one, range(len(ranges))))
+        failed = [r["segment"] for r in results if not r["ok"]]
+        if failed:
+            print(f"❌ Segment(s) {failed} failed: {results[failed[0]].get('error')}")
+            return False
+        concat_segments(seg_paths, output_path)
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Could not join segments: {e}")
+        return False
+    finally:
+        shutil.rmtree(seg_dir, ignore_errors=True)
+
+def render_composition(comp_id, props, output_path, props_arg=None, use_cache=True,
+                       cache_max_mb=render_cache.DEFAULT_MAX_MB, concurrency=None, segments=1,
+                       on_progress=print_event, progress_log=None, encoding=None):
+    """
+    Render `comp_id` with `props` to `output_path`, reusing a cached render if possible.
+    `props_arg` is passed to --props instead of the inline JSON (e.g. a props file path).
+    `concurrency` is Remotion's number of frames rendered in parallel (default: its own).
+    `segments` > 1 splits long videos into parallel segment renders (see render_segmented).
+    `on_progress` receives structured progress events; `progress_log` appends them to a JSONL file.
+    `encoding` holds codec / CRF / scale / pixel and image format settings (see presets.py).
+    Returns "rendered" or "cached" (copied from the render cache) on success, False on failure.
+    """
+    key = render_cache.cache_key(comp_id, props, extra=encoding) if use_cache else None
+    if key and render_cache.lookup(key, output_path):
+        print(f"⚡ Cache hit ({key[:12]}) - skipped rendering.")
         print(f"✅ Video saved to: {output_path}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Rendering failed: {e}")
+        return "cached"
+
+    if segments > 1:
+        if not render_segmented(comp_id, props, output_path, segments, props_arg, concurrency,
+                                on_progress, progress_log, encoding):
+            print("❌ Rendering failed.")
+            return False
+    else:
+        summary = render_single(comp_id, props, output_path, props_arg, concurrency, on_progress, progress_log,
+                                encoding)
+        if not summary["ok"]:
+            print(f"❌ Rendering failed: {summary.get('error')}")
+            return False
+
+    print(f"✅ Video saved to: {output_path}")
+    if key:
+        try:
+            render_cache.store(key, output_path, max_mb=cache_max_mb)
+        except OSError as e:
+            print(f"⚠️  Could not cache render: {e}")
+    return "rendered"
+
+def generate_video(text, title_color="#333333", bg_color="#ffffff", is_vertical=False,
+                   use_cache=True, cache_max_mb=render_cache.DEFAULT_MAX_MB, segments=1,
+                   on_progress=print_event, progress_log=None, preset=None):
+    """
+    1. Build input props (and encoding settings of `preset`: draft / standard / final)
+    2. Return the cached render, or run Remotion render
+    3. Save output to the current directory
+    """
+    check_dependencies()
+
+    comp_id, input_data = build_job(text, title_color, bg_color, is_vertical)
+    output_filename = "output_vertical.mp4" if is_vertical else "output_horizontal.mp4"
+    output_path = os.path.join(os.getcwd(), output_filename)
+
+    print(f"🎬 Rendering video ({comp_id}) with text length: {len(text)}...")
+    render_composition(comp_id, input_data, output_path, use_cache=use_cache, cache_max_mb=cache_max_mb,
+                       segments=segments, on_progress=on_progress, progress_log=progress_log,
+                       encoding=presets.resolve(preset, is_vertical))
+    return output_path
+
+def _truthy(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+def _slug(text, limit=30):
+    slug = re.sub(r"[^\w]+", "_", text[:limit]).strip("_")
+    return slug or "video"
+
+def load_batch(path):
+    """Read batch rows from a .jsonl or .csv file (one video per row)."""
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return list(csv.DictReader(f))
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+    return rows
+
+def batch_jobs(rows, out_dir, preset=None):
+    """Turn batch rows into render jobs: {"comp", "props", "output", "encoding"}."""
+    jobs = []
+    for i, row in enumerate(rows, 1):
+        text = str(row.get("text") or "Hello World").replace("\\n", "\n")
+        is_vertical = _truthy(row.get("vertical", ""))
+        comp_id, props = build_job(
+            text,
+            title_color=row.get("title_color") or "#333333",
+            bg_color=row.get("bg") or row.get("bg_color") or "#ffffff",
+            is_vertical=is_vertical,
+        )
+        comp_id = row.get("comp") or comp_id
+        if isinstance(row.get("props"), dict):
+            props.update(row["props"])
+        output = row.get("output") or f"{i:03d}_{_slug(text)}.mp4"
+        jobs.append({
+            "comp": comp_id,
+            "props": props,
+            "output": os.path.abspath(os.path.join(out_dir, output)),
+            "encoding": presets.resolve(row.get("preset") or preset, is_vertical),
+        })
+    return jobs
+
+def generate_batch(batch_path, out_dir="videos", use_cache=True, cache_max_mb=render_cache.DEFAULT_MAX_MB,
+                   on_progress=print_event, progress_log=None, preset=None):
+    """
+    Render every row of `batch_path` into its own file under `out_dir`.
+    Cached renders are copied; the rest are rendered by one Node process that
+    bundles the project once and reuses a single browser.
+    Progress events go to `on_progress` / `progress_log` like render_composition().
+    `preset` applies to rows without their own "preset" column.
+    Returns the list of jobs with an "ok" flag each.
+    """
+    check_dependencies()
+    jobs = batch_jobs(load_batch(batch_path), out_dir, preset)
+    os.makedirs(out_dir, exist_ok=True)
+
+    pending = []
+    for job in jobs:
+        job["key"] = render_cache.cache_key(job["comp"], job["props"], extra=job["encoding"]) if use_cache else None
+        job["ok"] = bool(job["key"]) and render_cache.lookup(job["key"], job["output"])
+        if not job["ok"]:
+            pending.append(job)
+    print(f"🎬 Batch: {len(jobs)} videos ({len(jobs) - len(pending)} cached, {len(pending)} to render)")
+
+    if pending:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump([{k: job[k] for k in ("comp", "props", "output", "encoding")} for job in pending], f,
+                      ensure_ascii=False)
+            jobs_file = f.name
+        by_output = {job["output"]: job for job in pending}
+        try:
+            proc = subprocess.Popen([shutil.which("node") or "node", BATCH_SCRIPT, jobs_file],
+                                    cwd=REMOTION_APP_DIR, stdout=subprocess.PIPE, text=True, encoding="utf-8")
+            for line in proc.stdout:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if progress_log:
+                    with open(progress_log, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                if on_progress:
+                    on_progress(result)
+                job = by_output.get(result.get("output"))
+                if job is None or result.get("event") != "done":
+                    continue
+                job["ok"] = result.get("ok", False)
+                if job["ok"]:
+                    print(f"✅ {os.path.basename(job['output'])}")
+                    if job["key"]:
+                        try:
+                            render_cache.store(job["key"], job["output"], max_mb=cache_max_mb)
+                        except OSError as e:
+                            print(f"⚠️  Could not cache render: {e}")
+                else:
+                    print(f"❌ {os.path.basename(job['output'])}: {result.get('error')}")
+            proc.wait()
+        except OSError as e:
+            print(f"❌ Could not start Node.js: {e}")
+        finally:
+            os.remove(jobs_file)
+
+    done = sum(1 for job in jobs if job["ok"])
+    print(f"📁 {done}/{len(jobs)} videos in {os.path.abspath(out_dir)}")
+    return jobs
+
+BENCH_TEXT = ("Awesome Business Automation\n"
+              "Render benchmark sample text.\n"
+              "Same text, every preset, both formats.")
+
+def benchmark_presets(text=BENCH_TEXT, out_dir="preset_bench", names=presets.PRESET_NAMES):
+    """
+    Render `text` under every preset in both orientations (cache bypassed) and
+    report wall time, render fps and file size. Returns one row per render.
+    """
+    check_dependencies()
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    for name in names:
+        for is_vertical in (False, True):
+            orientation = "vertical" if is_vertical else "horizontal"
+            comp_id, props = build_job(text, is_vertical=is_vertical)
+            encoding = presets.resolve(name, is_vertical)
+            output_path = os.path.abspath(os.path.join(out_dir, f"{name}_{orientation}.mp4"))
+            print(f"🎬 {name} / {orientation} ({comp_id})...")
+            summary = render_single(comp_id, props, output_path, encoding=encoding, on_progress=None)
+            rows.append({
+                "preset": name,
+                "format": orientation,
+                "ok": summary["ok"],
+                "seconds": summary["seconds"],
+                "fps": summary["fps"],
+                "size_mb": round(summary["size_bytes"] / (1024 * 1024), 2) if summary["size_bytes"] else None,
+            })
+            if not summary["ok"]:
+                print(f"❌ Rendering failed: {summary.get('error')}")
+
+    print("--- Preset Benchmark ---")
+    print(f"{'preset':<10}{'format':<12}{'wall s':>8}{'fps':>8}{'MB':>8}")
+    for row in rows:
+        if row["ok"]:
+            print(f"{row['preset']:<10}{row['format']:<12}{row['seconds']:>8.1f}{row['fps'] or 0:>8.1f}"
+                  f"{row['size_mb'] or 0:>8.2f}")
+        else:
+            print(f"{row['preset']:<10}{row['format']:<12}{'failed':>8}")
+    return rows
 
 if __name__ == "__main__":
     import argparse
@@ -85,29 +373,39 @@ if __name__ == "__main__":
     parser.add_argument("--bg", type=str, default="#ffffff", help="Background color hex")
     parser.add_argument("--vertical", action="store_true", help="Generate vertical video (9:16)")
     parser.add_argument("--interactive", action="store_true", help="Use interactive mode")
+    parser.add_argument("--batch", type=str, help="JSONL/CSV of videos to render in one bundle")
+    parser.add_argument("--out-dir", type=str, default="videos", help="Output directory for --batch")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-render (ignore the render cache)")
+    parser.add_argument("--cache-max-mb", type=int, default=render_cache.DEFAULT_MAX_MB,
+                        help="Evict least recently used cached renders beyond this size")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="Render long videos as N parallel segments joined by stream copy")
+    parser.add_argument("--progress-log", type=str, help="Append structured progress events (JSONL) to this file")
+    parser.add_argument("--preset", choices=presets.PRESET_NAMES,
+                        help="Encoding preset: draft (fast, half size), standard, final (slow, best quality)")
+    parser.add_argument("--bench-presets", action="store_true",
+                        help="Render a sample text under every preset and compare time / fps / size")
 
     args = parser.parse_args()
 
-    if args.props_file:
+    if args.bench_presets:
+        benchmark_presets()
+    elif args.batch:
+        generate_batch(args.batch, args.out_dir, use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                       progress_log=args.progress_log, preset=args.preset)
+    elif args.props_file:
         # Direct render with file
         comp_id = "TerminalVertical" if args.vertical else "HelloWorld"
         output_filename = "output_vertical.mp4" if args.vertical else "output_horizontal.mp4"
         output_path = os.path.join(os.getcwd(), output_filename)
         props_abs_path = os.path.abspath(args.props_file)
         print(f"🎬 Rendering from file: {props_abs_path}")
-        cmd = [
-            "npx", "remotion", "render",
-            "src/index.ts",
-            comp_id,
-            output_path,
-            f"--props={props_abs_path}",
-            "--overwrite"
-        ]
-        try:
-            subprocess.check_call(cmd, cwd=REMOTION_APP_DIR, shell=True)
-            print(f"✅ Video saved to: {output_path}")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Rendering failed: {e}")
+        with open(props_abs_path, encoding="utf-8") as f:
+            file_props = json.load(f)
+        render_composition(comp_id, file_props, output_path, props_arg=props_abs_path,
+                           use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                           segments=args.segments, progress_log=args.progress_log,
+                           encoding=presets.resolve(args.preset, args.vertical))
     elif args.interactive:
         print("--- Text-to-Video Generator ---")
         user_text = input("Enter text (use \\n for new lines): ").replace("\\n", "\n")
@@ -121,7 +419,9 @@ if __name__ == "__main__":
         format_in = input("Vertical format for Pinterest? (y/n, default n): ").lower()
         vertical = format_in == 'y'
 
-        generate_video(user_text, bg_color=user_bg, is_vertical=vertical)
+        generate_video(user_text, bg_color=user_bg, is_vertical=vertical,
+                       use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                       segments=args.segments, progress_log=args.progress_log, preset=args.preset)
     else:
         if not args.text:
             print("--- Text-to-Video Generator (Interactive) ---")
@@ -131,7 +431,11 @@ if __name__ == "__main__":
                 user_text = "Hello World"
             user_bg = input("Background Color (hex, default #ffffff): ") or "#ffffff"
             format_in = input("Vertical format for Pinterest? (y/n, default n): ").lower()
-            generate_video(user_text, bg_color=user_bg, is_vertical=(format_in == 'y'))
+            generate_video(user_text, bg_color=user_bg, is_vertical=(format_in == 'y'),
+                           use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                           segments=args.segments, progress_log=args.progress_log, preset=args.preset)
         else:
             text_clean = args.text.replace("\\n", "\n")
-            generate_video(text_clean, bg_color=args.bg, is_vertical=args.vertical)
+            generate_video(text_clean, bg_color=args.bg, is_vertical=args.vertical,
+                           use_cache=not args.no_cache, cache_max_mb=args.cache_max_mb,
+                           segments=args.segments, progress_log=args.progress_log, preset=args.preset)
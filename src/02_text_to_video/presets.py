@@ -0,0 +1,65 @@
+"""
+Encoding Presets
+================
+Named render settings that trade quality for render time and file size.
+
+    draft     half resolution, high CRF, fast x264 preset (quick previews)
+    standard  full resolution, JPEG frames, balanced CRF
+    final     full resolution, PNG frames, low CRF, slow x264 preset (uploads)
+
+Each preset has a vertical (1080x1920) and a horizontal (1920x1080) variant.
+Settings map to `remotion render` flags (cli_args) and to renderMedia()
+options in render_batch.mjs (same keys, camelCase there).
+"""
+
+PRESET_NAMES = ("draft", "standard", "final")
+
+PRESETS = {
+    ("draft", "horizontal"): {
+        "codec": "h264", "crf": 30, "scale": 0.5, "pixel_format": "yuv420p",
+        "image_format": "jpeg", "jpeg_quality": 60, "x264_preset": "veryfast",
+    },
+    ("draft", "vertical"): {
+        "codec": "h264", "crf": 30, "scale": 0.5, "pixel_format": "yuv420p",
+        "image_format": "jpeg", "jpeg_quality": 60, "x264_preset": "veryfast",
+    },
+    ("standard", "horizontal"): {
+        "codec": "h264", "crf": 23, "scale": 1, "pixel_format": "yuv420p",
+        "image_format": "jpeg", "jpeg_quality": 80, "x264_preset": "medium",
+    },
+    # Vertical clips are re-encoded by Pinterest / Shorts, so keep a bit more detail
+    ("standard", "vertical"): {
+        "codec": "h264", "crf": 21, "scale": 1, "pixel_format": "yuv420p",
+        "image_format": "jpeg", "jpeg_quality": 85, "x264_preset": "medium",
+    },
+    ("final", "horizontal"): {
+        "codec": "h264", "crf": 18, "scale": 1, "pixel_format": "yuv420p",
+        "image_format": "png", "x264_preset": "slow",
+    },
+    ("final", "vertical"): {
+        "codec": "h264", "crf": 17, "scale": 1, "pixel_format": "yuv420p",
+        "image_format": "png", "x264_preset": "slow",
+    },
+}
+
+CLI_FLAGS = {
+    "codec": "--codec",
+    "crf": "--crf",
+    "scale": "--scale",
+    "pixel_format": "--pixel-format",
+    "image_format": "--image-format",
+    "jpeg_quality": "--jpeg-quality",
+    "x264_preset": "--x264-preset",
+}
+
+def resolve(name, is_vertical=False):
+    """Settings dict for preset `name` ("draft"/"standard"/"final"), or {} for None."""
+    if not name:
+        return {}
+    if name not in PRESET_NAMES:
+        raise ValueError(f"Unknown preset '{name}' (choose from {', '.join(PRESET_NAMES)})")
+    return dict(PRESETS[(name, "vertical" if is_vertical else "horizontal")])
+
+def cli_args(settings):
+    """`remotion render` flags for a settings dict."""
+    return [f"{CLI_FLAGS[key]}={value}" for key, value in settings.items() if key in CLI_FLAGS]
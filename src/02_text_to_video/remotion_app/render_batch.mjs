@@ -0,0 +1,123 @@
+// Bundle-once batch renderer.
+//
+// Usage: node render_batch.mjs jobs.json
+//
+// jobs.json is a list of {"comp": "HelloWorld", "props": {...}, "output": "/abs/path.mp4",
+// "encoding": {...}} where encoding holds preset settings from presets.py.
+// The project is bundled once and one browser is shared by every render, so
+// the per-video cost is only the render itself. Progress events and one
+// "done" result per job are printed to stdout as JSON lines (same shape as
+// render_progress.py); logs go to stderr.
+
+import fs from 'node:fs';
+import path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { bundle } from '@remotion/bundler';
+import { openBrowser, renderMedia, selectComposition } from '@remotion/renderer';
+
+const appDir = path.dirname(fileURLToPath(import.meta.url));
+const jobs = JSON.parse(fs.readFileSync(process.argv[2], 'utf-8'));
+
+// presets.py setting names -> renderMedia() options
+const encodingOptions = (encoding = {}) => {
+    const options = { codec: encoding.codec ?? 'h264', imageFormat: encoding.image_format ?? 'jpeg' };
+    if (encoding.crf !== undefined) options.crf = encoding.crf;
+    if (encoding.scale !== undefined) options.scale = encoding.scale;
+    if (encoding.pixel_format !== undefined) options.pixelFormat = encoding.pixel_format;
+    if (encoding.jpeg_quality !== undefined) options.jpegQuality = encoding.jpeg_quality;
+    if (encoding.x264_preset !== undefined) options.x264Preset = encoding.x264_preset;
+    return options;
+};
+
+const startedAt = Date.now();
+const seconds = (since) => (Date.now() - since) / 1000;
+const emit = (event) => process.stdout.write(JSON.stringify({ t: seconds(startedAt), ...event }) + '\n');
+
+// Remotion reports progress far more often than anyone needs it
+const EVENT_INTERVAL_MS = 500;
+let lastEmit = 0;
+const emitThrottled = (event, final) => {
+    if (final || Date.now() - lastEmit >= EVENT_INTERVAL_MS) {
+        lastEmit = Date.now();
+        emit(event);
+    }
+};
+
+const serveUrl = await bundle({
+    entryPoint: path.join(appDir, 'src', 'index.ts'),
+    onProgress: (percent) => emitThrottled({ event: 'bundling', progress: percent / 100 }, percent >= 100),
+});
+emit({ event: 'bundled', seconds: seconds(startedAt) });
+
+const browser = await openBrowser('chrome');
+let failed = 0;
+try {
+    for (const job of jobs) {
+        const started = Date.now();
+        try {
+            const composition = await selectComposition({
+                serveUrl,
+                id: job.comp,
+                inputProps: job.props,
+                puppeteerInstance: browser,
+            });
+            const total = composition.durationInFrames;
+            let renderSeconds = null;
+            await renderMedia({
+                composition,
+                serveUrl,
+                ...encodingOptions(job.encoding),
+                outputLocation: job.output,
+                inputProps: job.props,
+                puppeteerInstance: browser,
+                overwrite: true,
+                onProgress: ({ renderedFrames, encodedFrames }) => {
+                    const elapsed = seconds(started);
+                    const renderDone = renderedFrames >= total && renderSeconds === null;
+                    if (renderDone) {
+                        renderSeconds = elapsed;
+                    }
+                    const fps = elapsed > 0 ? renderedFrames / elapsed : null;
+                    emitThrottled({
+                        event: 'rendering',
+                        output: job.output,
+                        frame: renderedFrames,
+                        total,
+                        fps,
+                        eta: fps ? (total - renderedFrames) / fps : null,
+                    }, renderDone);
+                    if (encodedFrames > 0) {
+                        emitThrottled({ event: 'encoding', output: job.output, frame: encodedFrames, total },
+                            encodedFrames >= total);
+                    }
+                },
+            });
+            const elapsed = seconds(started);
+            renderSeconds = renderSeconds ?? elapsed;
+            emit({
+                event: 'done',
+                output: job.output,
+                ok: true,
+                seconds: elapsed,
+                render_seconds: renderSeconds,
+                encode_seconds: elapsed - renderSeconds,
+                frames: total,
+                fps: total / renderSeconds,
+                size_bytes: fs.statSync(job.output).size,
+            });
+        } catch (err) {
+            failed += 1;
+            emit({
+                event: 'done',
+                output: job.output,
+                ok: false,
+                seconds: seconds(started),
+                error: String(err && err.message ? err.message : err),
+            });
+        }
+    }
+} finally {
+    await browser.close({ silent: false });
+}
+
+process.exit(failed ? 1 : 0);
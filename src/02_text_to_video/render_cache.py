@@ -0,0 +1,143 @@
+"""
+Render Cache
+============
+Content-addressed cache for rendered videos.
+
+The key is a SHA-256 over the composition ID, the input props (as sorted
+JSON) and the Remotion app sources (src/, remotion.config.ts,
+render_batch.mjs, package.json, package-lock.json). Editing a composition or upgrading Remotion therefore
+invalidates old entries automatically.
+
+Entries are plain `<key>.mp4` files. A hit touches the file's mtime, and
+eviction removes the least recently used files once the cache grows past
+the size limit. No index file is kept, so several render processes can
+share the cache safely.
+
+Usage:
+    python render_cache.py --stats
+    python render_cache.py --clear
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+
+CACHE_DIR = os.environ.get(
+    "RENDER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "awesome-business-automation", "renders"),
+)
+DEFAULT_MAX_MB = int(os.environ.get("RENDER_CACHE_MAX_MB", "2048"))
+
+REMOTION_APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "remotion_app")
+SOURCE_FILES = ["remotion.config.ts", "render_batch.mjs", "package.json", "package-lock.json"]
+SOURCE_DIRS = ["src"]
+
+_source_hash = {}
+
+def source_hash(app_dir=REMOTION_APP_DIR):
+    """Hash of every file the render output depends on (computed once per process)."""
+    if app_dir in _source_hash:
+        return _source_hash[app_dir]
+
+    paths = [os.path.join(app_dir, name) for name in SOURCE_FILES]
+    for name in SOURCE_DIRS:
+        for root, dirs, files in os.walk(os.path.join(app_dir, name)):
+            dirs.sort()
+            paths += [os.path.join(root, f) for f in sorted(files)]
+
+    digest = hashlib.sha256()
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        digest.update(os.path.relpath(path, app_dir).replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    _source_hash[app_dir] = digest.hexdigest()
+    return _source_hash[app_dir]
+
+def cache_key(comp_id, props, extra=None):
+    """Key for one render: composition + props (+ any render options in `extra`)."""
+    payload = json.dumps(
+        {"comp": comp_id, "props": props, "extra": extra or {}, "sources": source_hash()},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.mp4")
+
+def lookup(key, output_path):
+    """Copy a cached render to `output_path`. Returns True on a hit."""
+    path = _entry_path(key)
+    if not os.path.exists(path):
+        return False
+    try:
+        os.utime(path)
+        shutil.copyfile(path, output_path)
+    except OSError:
+        return False
+    return True
+
+def store(key, rendered_path, max_mb=DEFAULT_MAX_MB):
+    """Add a finished render to the cache (atomic rename), then evict down to `max_mb`."""
+    if not os.path.exists(rendered_path):
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{_entry_path(key)}.{os.getpid()}.tmp"
+    shutil.copyfile(rendered_path, tmp_path)
+    os.replace(tmp_path, _entry_path(key))
+    evict(max_mb)
+
+def _entries():
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".mp4"):
+            continue
+        try:
+            st = os.stat(os.path.join(CACHE_DIR, name))
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, name))
+    return entries
+
+def evict(max_mb=DEFAULT_MAX_MB):
+    """Delete least recently used entries until the cache fits in `max_mb`. Returns files removed."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    limit = max_mb * 1024 * 1024
+    removed = 0
+    for _, size, name in entries:
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+def stats():
+    entries = _entries()
+    return {
+        "dir": CACHE_DIR,
+        "entries": len(entries),
+        "size_mb": round(sum(size for _, size, _ in entries) / (1024 * 1024), 2),
+        "max_mb": DEFAULT_MAX_MB,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render cache for the text-to-video generator")
+    parser.add_argument("--stats", action="store_true", help="Show cache size and entry count")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached render")
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"🗑️  Removed {CACHE_DIR}")
+    else:
+        print(json.dumps(stats(), indent=2))
@@ -0,0 +1,181 @@
+"""
+Render Progress
+===============
+Runs a Remotion CLI command without a shell and turns its progress output
+into structured events:
+
+    {"event": "bundling",  "progress": 0.42}
+    {"event": "bundled",   "seconds": 3.1}
+    {"event": "rendering", "frame": 60, "total": 150, "fps": 24.5, "eta": 3.7}
+    {"event": "encoding",  "frame": 150, "total": 150}
+    {"event": "done", "ok": true, "seconds": 12.0, "bundle_seconds": 3.1,
+     "render_seconds": 6.1, "encode_seconds": 0.8, "frames": 150, "fps": 24.6,
+     "size_bytes": 812345, "output": "..."}
+
+Every event also carries "t" (seconds since start). Events are passed to an
+optional callback and can be appended to a JSONL log.
+
+Usage:
+    from render_progress import run_remotion
+    summary = run_remotion(cmd, cwd, output_path, on_event=print, log_path="render_log.jsonl")
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import codecs
+import subprocess
+
+BUNDLING_PATTERN = re.compile(r"Bundl\w*\D*?(\d+(?:\.\d+)?)%")
+RENDERED_PATTERN = re.compile(r"Rendered\s+(\d+)\s*/\s*(\d+)")
+ENCODED_PATTERN = re.compile(r"(?:Encoded|Stitched)\s+(\d+)\s*/\s*(\d+)")
+
+# Minimum seconds between two rendering/encoding events (Remotion prints far more often)
+EVENT_INTERVAL = 0.5
+
+class ProgressParser:
+    """Feed Remotion output lines with feed(); collects phase timings for summary()."""
+
+    def __init__(self, on_event=None, log_path=None, tags=None):
+        self.on_event = on_event
+        self.log_path = log_path
+        self.tags = dict(tags or {})
+        self.started = time.perf_counter()
+        self.render_started = None
+        self.render_finished = None
+        self.bundle_seconds = None
+        self.frames = 0
+        self.total = None
+        self._last_emit = {}
+        self.lines = []
+
+    def _now(self):
+        return time.perf_counter() - self.started
+
+    def emit(self, event, throttle=False, **fields):
+        now = self._now()
+        if throttle and now - self._last_emit.get(event, -EVENT_INTERVAL) < EVENT_INTERVAL:
+            return
+        self._last_emit[event] = now
+        record = {"event": event, "t": round(now, 3), **self.tags, **fields}
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.on_event:
+            self.on_event(record)
+
+    def _bundled(self):
+        if self.bundle_seconds is None:
+            self.bundle_seconds = self._now()
+            self.emit("bundled", seconds=round(self.bundle_seconds, 3))
+
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        self.lines = (self.lines + [line])[-20:]
+
+        match = RENDERED_PATTERN.search(line)
+        if match:
+            self._bundled()
+            frame, total = int(match.group(1)), int(match.group(2))
+            now = self._now()
+            if self.render_started is None:
+                self.render_started = now
+            self.frames, self.total = frame, total
+            elapsed = now - self.render_started
+            fps = frame / elapsed if elapsed > 0 else None
+            eta = (total - frame) / fps if fps else None
+            if frame >= total:
+                self.render_finished = now
+            self.emit("rendering", throttle=frame < total, frame=frame, total=total,
+                      fps=round(fps, 2) if fps else None, eta=round(eta, 1) if eta is not None else None)
+            return
+
+        match = ENCODED_PATTERN.search(line)
+        if match:
+            frame, total = int(match.group(1)), int(match.group(2))
+            self.emit("encoding", throttle=frame < total, frame=frame, total=total)
+            return
+
+        match = BUNDLING_PATTERN.search(line)
+        if match and self.render_started is None:
+            progress = float(match.group(1)) / 100
+            self.emit("bundling", throttle=progress < 1, progress=round(progress, 3))
+
+    def summary(self, ok, output_path=None):
+        """Emit and return the final "done" event."""
+        total_seconds = self._now()
+        render_end = self.render_finished or total_seconds
+        render_seconds = render_end - self.render_started if self.render_started is not None else None
+        size = os.path.getsize(output_path) if ok and output_path and os.path.exists(output_path) else None
+        fields = {
+            "ok": ok,
+            "seconds": round(total_seconds, 3),
+            "bundle_seconds": round(self.bundle_seconds, 3) if self.bundle_seconds is not None else None,
+            "render_seconds": round(render_seconds, 3) if render_seconds is not None else None,
+            "encode_seconds": round(total_seconds - render_end, 3) if self.render_started is not None else None,
+            "frames": self.frames,
+            "fps": round(self.frames / render_seconds, 2) if render_seconds else None,
+            "size_bytes": size,
+            "output": output_path,
+        }
+        if not ok:
+            fields["error"] = " | ".join(self.lines[-5:])
+        self.emit("done", **fields)
+        return {"event": "done", **self.tags, **fields}
+
+def run_remotion(cmd, cwd, output_path=None, on_event=None, log_path=None, tags=None, echo=False):
+    """
+    Run `cmd` (argument list, no shell) in `cwd`, parsing progress from its
+    output. `echo=True` also passes the raw output through to the console.
+    Returns the summary ("done" event) dict; summary["ok"] tells success.
+    """
+    parser = ProgressParser(on_event, log_path, tags)
+    try:
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except OSError as e:
+        parser.lines.append(str(e))
+        return parser.summary(False, output_path)
+
+    # Progress is written with carriage returns, so split on both \r and \n
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = proc.stdout.read1(4096)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        if echo:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        parts = re.split(r"[\r\n]", pending + text)
+        pending = parts.pop()
+        for part in parts:
+            parser.feed(part)
+    parser.feed(pending + decoder.decode(b"", final=True))
+
+    return parser.summary(proc.wait() == 0, output_path)
+
+def print_event(event):
+    """Default console callback: one compact line per event."""
+    kind = event["event"]
+    prefix = f"[{event['segment']}] " if "segment" in event else ""
+    if kind == "bundling":
+        print(f"   {prefix}📦 Bundling {event['progress']:.0%}")
+    elif kind == "bundled":
+        print(f"   {prefix}📦 Bundled in {event['seconds']:.1f}s")
+    elif kind == "rendering":
+        fps = f"{event['fps']:.1f} fps" if event.get("fps") else "-"
+        eta = f", ETA {event['eta']:.0f}s" if event.get("eta") is not None else ""
+        print(f"   {prefix}🎞️  {event['frame']}/{event['total']} frames ({fps}{eta})")
+    elif kind == "encoding" and event["frame"] >= event["total"]:
+        print(f"   {prefix}🔧 Encoded {event['frame']} frames")
+    elif kind == "done" and event["ok"]:
+        size = f", {event['size_bytes'] / (1024 * 1024):.1f} MB" if event.get("size_bytes") else ""
+        bundle = f"bundle {event['bundle_seconds']:.1f}s, " if event.get("bundle_seconds") is not None else ""
+        print(f"   {prefix}⏱️  {event['seconds']:.1f}s total ({bundle}"
+              f"render {event.get('render_seconds') or 0:.1f}s @ {event.get('fps') or 0:.1f} fps, "
+              f"encode {event.get('encode_seconds') or 0:.1f}s{size})")
@@ -0,0 +1,319 @@
+"""
+Render Queue
+============
+SQLite-backed queue for rendering many videos on one machine.
+
+Jobs are submitted to a queue file and a scheduler runs them across worker
+processes. The CPU is split between concurrent jobs and Remotion's
+per-job frame concurrency: workers x --concurrency = cores.
+
+- Failed renders are retried (--max-attempts) before they are marked failed.
+- The queue survives restarts: jobs left "running" by a killed scheduler
+  are put back in the queue on the next start, or marked failed if they
+  already used all their attempts (a job that takes the machine down is
+  not retried forever).
+- One scheduler per queue file: `run` refuses to start while another
+  scheduler's heartbeat is recent.
+- Throughput is reported per job and overall as frames/s and frames/s per core.
+  Jobs served from the render cache are marked cached and left out of it.
+
+Usage:
+    python render_queue.py submit --text "Hello\\nWorld" --vertical
+    python render_queue.py submit --batch videos.csv --out-dir videos
+    python render_queue.py run --workers 2 --concurrency 4
+    python render_queue.py status
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import multiprocessing as mp
+
+import generator
+import presets
+
+DEFAULT_QUEUE = "render_queue.db"
+DEFAULT_MAX_ATTEMPTS = 3
+HEARTBEAT_SECONDS = 10
+SCHEDULER_STALE_SECONDS = 60  # a scheduler silent for this long is considered dead
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    comp TEXT NOT NULL,
+    props TEXT NOT NULL,
+    output TEXT NOT NULL,
+    encoding TEXT,
+    cached INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    frames INTEGER,
+    concurrency INTEGER,
+    seconds REAL,
+    error TEXT,
+    submitted_at REAL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS scheduler (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pid INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+);
+"""
+
+def connect(path=DEFAULT_QUEUE):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Queues created before encoding presets / cache-hit tracking existed
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if "encoding" not in existing:
+        conn.execute("ALTER TABLE jobs ADD COLUMN encoding TEXT")
+    if "cached" not in existing:
+        conn.execute("ALTER TABLE jobs ADD COLUMN cached INTEGER NOT NULL DEFAULT 0")
+    return conn
+
+def submit(conn, jobs, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue render jobs ({"comp", "props", "output", "encoding"}, as built by generator.batch_jobs). Returns ids."""
+    ids = []
+    now = time.time()
+    for job in jobs:
+        cur = conn.execute(
+            "INSERT INTO jobs (comp, props, output, encoding, max_attempts, frames, submitted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job["comp"], json.dumps(job["props"], ensure_ascii=False), job["output"],
+             json.dumps(job.get("encoding") or {}), max_attempts, job["props"].get("durationInFrames"), now),
+        )
+        ids.append(cur.lastrowid)
+    return ids
+
+def acquire_scheduler(conn):
+    """
+    Register this process as the queue's scheduler. Returns False if another
+    scheduler's heartbeat is younger than SCHEDULER_STALE_SECONDS.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT heartbeat FROM scheduler WHERE id = 1").fetchone()
+        if row is not None and time.time() - row["heartbeat"] < SCHEDULER_STALE_SECONDS:
+            conn.execute("ROLLBACK")
+            return False
+        conn.execute("INSERT OR REPLACE INTO scheduler (id, pid, heartbeat) VALUES (1, ?, ?)",
+                     (os.getpid(), time.time()))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+def heartbeat(conn):
+    conn.execute("UPDATE scheduler SET heartbeat = ? WHERE id = 1 AND pid = ?", (time.time(), os.getpid()))
+
+def release_scheduler(conn):
+    conn.execute("DELETE FROM scheduler WHERE id = 1 AND pid = ?", (os.getpid(),))
+
+def requeue_stale(conn):
+    """
+    Jobs left 'running' by a previous (killed) scheduler: back in the queue,
+    or failed if they already used all attempts. Only call while holding the
+    scheduler slot (acquire_scheduler), so running jobs really are orphaned.
+    Returns (requeued, failed).
+    """
+    failed = conn.execute(
+        "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'interrupted: scheduler stopped'), "
+        "finished_at = ? WHERE status = 'running' AND attempts >= max_attempts", (time.time(),)
+    ).rowcount
+    requeued = conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+    return requeued, failed
+
+def claim(conn):
+    """Atomically take the oldest queued job. Returns a row or None."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+        if row is not None:
+            conn.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?",
+                         (time.time(), row["id"]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+def finish(conn, job_id, ok, seconds, concurrency, error=None, cached=False):
+    """
+    Mark a job done, or re-queue it until it runs out of attempts.
+    `cached` = the output was copied from the render cache (not counted as rendering throughput).
+    """
+    if ok:
+        status = "done"
+    else:
+        row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+    conn.execute(
+        "UPDATE jobs SET status = ?, seconds = ?, concurrency = ?, error = ?, cached = ?, finished_at = ? "
+        "WHERE id = ?",
+        (status, seconds, concurrency, error, int(bool(cached)), time.time(), job_id),
+    )
+    return status
+
+def plan(workers=None, concurrency=None, cores=None):
+    """
+    Split `cores` between concurrent jobs and per-job frame concurrency.
+    Whatever is not given is derived so that workers x concurrency ~= cores.
+    """
+    cores = cores or os.cpu_count() or 1
+    if workers and concurrency:
+        return workers, concurrency
+    if workers:
+        return workers, max(1, cores // workers)
+    if concurrency:
+        return max(1, cores // concurrency), concurrency
+    # Default: a few jobs side by side (hides bundling / encoding gaps), the rest as frame concurrency
+    workers = max(1, min(4, cores // 4))
+    return workers, max(1, cores // workers)
+
+def worker_main(worker_id, queue_path, concurrency, use_cache):
+    """Entry point of one worker process: claim and render jobs until the queue is empty."""
+    conn = connect(queue_path)
+    while True:
+        row = claim(conn)
+        if row is None:
+            break
+        props = json.loads(row["props"])
+        print(f"🎬 [W{worker_id}] Job {row['id']} ({row['comp']}, {row['frames']} frames, "
+              f"attempt {row['attempts'] + 1}/{row['max_attempts']})")
+        os.makedirs(os.path.dirname(os.path.abspath(row["output"])), exist_ok=True)
+        started = time.perf_counter()
+        try:
+            encoding = json.loads(row["encoding"] or "{}")
+            outcome = generator.render_composition(row["comp"], props, row["output"], use_cache=use_cache,
+                                                   concurrency=concurrency, encoding=encoding)
+            error = None if outcome else "remotion render failed"
+        except Exception as e:
+            outcome, error = False, str(e)
+        ok, cached = bool(outcome), outcome == "cached"
+        seconds = time.perf_counter() - started
+        status = finish(conn, row["id"], ok, seconds, concurrency, error, cached)
+        if cached:
+            print(f"⚡ [W{worker_id}] Job {row['id']}: cache hit, not counted in throughput")
+        elif ok and row["frames"]:
+            fps = row["frames"] / seconds
+            print(f"📊 [W{worker_id}] Job {row['id']}: {seconds:.1f}s, {fps:.1f} fps, "
+                  f"{fps / concurrency:.2f} fps/core")
+        elif not ok:
+            print(f"⚠️  [W{worker_id}] Job {row['id']} {status}: {error}")
+    conn.close()
+
+def run(queue_path=DEFAULT_QUEUE, workers=None, concurrency=None, use_cache=True):
+    """Run every queued job across worker processes. Returns the status summary."""
+    workers, concurrency = plan(workers, concurrency)
+    conn = connect(queue_path)
+    if not acquire_scheduler(conn):
+        conn.close()
+        raise SystemExit(f"Another scheduler is running on {queue_path} "
+                         f"(heartbeat within the last {SCHEDULER_STALE_SECONDS}s).")
+    try:
+        requeued, failed = requeue_stale(conn)
+        if requeued:
+            print(f"♻️  Re-queued {requeued} job(s) interrupted by a previous run.")
+        if failed:
+            print(f"⚠️  {failed} interrupted job(s) had no attempts left and were marked failed.")
+        print(f"🚀 {workers} worker(s) x concurrency {concurrency} on {os.cpu_count()} cores")
+
+        started = time.time()
+        procs = [mp.Process(target=worker_main, name=f"render-{k}", args=(k, queue_path, concurrency, use_cache))
+                 for k in range(workers)]
+        for p in procs:
+            p.start()
+        while True:
+            alive = [p for p in procs if p.is_alive()]
+            if not alive:
+                break
+            alive[0].join(HEARTBEAT_SECONDS)
+            heartbeat(conn)
+        for p in procs:
+            p.join()
+    finally:
+        release_scheduler(conn)
+
+    wall = time.time() - started
+    frames = conn.execute(
+        "SELECT COALESCE(SUM(frames), 0) FROM jobs WHERE status = 'done' AND cached = 0 AND finished_at >= ?",
+        (started,)
+    ).fetchone()[0]
+    summary = status(conn)
+    conn.close()
+    if frames and wall > 0:
+        cores = workers * concurrency
+        print(f"📈 {frames} frames in {wall:.1f}s = {frames / wall:.1f} fps, {frames / wall / cores:.2f} fps/core")
+    return summary
+
+def status(conn):
+    """Job counts per status, e.g. {"queued": 3, "done": 10}."""
+    return {row["status"]: row["n"] for row in
+            conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+
+def throughput(conn):
+    """Frames/s and frames/s per core over all rendered jobs (cache hits are counted separately)."""
+    cached = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'done' AND cached = 1").fetchone()[0]
+    row = conn.execute(
+        "SELECT COUNT(*) AS jobs, SUM(frames) AS frames, SUM(seconds) AS seconds, "
+        "SUM(seconds * concurrency) AS core_seconds FROM jobs "
+        "WHERE status = 'done' AND cached = 0 AND frames IS NOT NULL"
+    ).fetchone()
+    if not row["seconds"]:
+        return {"jobs": row["jobs"], "cached": cached}
+    return {
+        "jobs": row["jobs"],
+        "cached": cached,
+        "frames": row["frames"],
+        "fps_per_job": round(row["frames"] / row["seconds"], 2),
+        "fps_per_core": round(row["frames"] / row["core_seconds"], 3),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite-backed render queue")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help="Queue database file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("submit", help="Add render jobs to the queue")
+    s.add_argument("--text", type=str, help="Text to display (use \\n for newlines)")
+    s.add_argument("--bg", type=str, default="#ffffff", help="Background color hex")
+    s.add_argument("--vertical", action="store_true", help="Generate vertical video (9:16)")
+    s.add_argument("--output", type=str, help="Output file for --text")
+    s.add_argument("--batch", type=str, help="JSONL/CSV of videos (same format as generator.py --batch)")
+    s.add_argument("--out-dir", type=str, default="videos", help="Output directory")
+    s.add_argument("--preset", choices=presets.PRESET_NAMES, help="Encoding preset for these jobs")
+    s.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    r = sub.add_parser("run", help="Render all queued jobs")
+    r.add_argument("--workers", type=int, help="Concurrent render jobs (default: from core count)")
+    r.add_argument("--concurrency", type=int, help="Remotion frame concurrency per job (default: cores / workers)")
+    r.add_argument("--no-cache", action="store_true", help="Always re-render (ignore the render cache)")
+
+    sub.add_parser("status", help="Show job counts and throughput")
+    args = parser.parse_args()
+
+    conn = connect(args.queue)
+    if args.command == "submit":
+        if args.batch:
+            rows = generator.load_batch(args.batch)
+        elif args.text:
+            rows = [{"text": args.text, "bg": args.bg, "vertical": "y" if args.vertical else "",
+                     "output": args.output}]
+        else:
+            parser.error("submit needs --text or --batch")
+        ids = submit(conn, generator.batch_jobs(rows, args.out_dir, args.preset), max_attempts=args.max_attempts)
+        print(f"📥 Queued {len(ids)} job(s) in {args.queue}")
+    elif args.command == "run":
+        conn.close()
+        print(json.dumps(run(args.queue, args.workers, args.concurrency, use_cache=not args.no_cache), indent=2))
+    else:
+        print(json.dumps({"jobs": status(conn), "throughput": throughput(conn)}, indent=2))
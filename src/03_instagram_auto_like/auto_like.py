@@ -11,31 +11,22 @@ Usage:
     python auto_like.py --username "your_user" --password "your_pass" --hashtag "python,programming"
 """
 
+import os
+import sys
 import time
 import random
 import argparse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-def setup_driver(headless=False):
-    options = webdriver.ChromeOptions()
-    if headless:
-        options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    # Anti-detection
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
+# Shared driver factory lives in <repo>/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from utils.driver_factory import create_chrome_driver
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    return driver
+def setup_driver(headless=False):
+    return create_chrome_driver(headless=headless)
 
 def login(driver, username, password):
     print("🔑 Logging in...")
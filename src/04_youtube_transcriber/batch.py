@@ -0,0 +1,223 @@
+"""
+Batch Transcriber
+=================
+Fetches transcripts for many videos concurrently.
+
+- Reads URLs / IDs from a file (or stdin with "-"), one per line; blank lines
+  and lines starting with # are skipped. Everything is normalized with
+  extract_video_id() and deduplicated.
+- A bounded thread pool fetches in-process, with one YouTubeTranscriptApi
+  instance per thread (the class is not thread-safe).
+- Video fetches are paced globally (--min-interval seconds between fetch
+  starts across all threads), so more workers never exceed that rate.
+  Each fetch (or retry) is about three HTTP requests: watch page, player
+  API and caption track.
+- Temporary failures are retried with exponential backoff; videos without
+  transcripts are not retried.
+- Transcripts already in the local cache (transcript_cache.py) are served
+  without a request, so re-runs of mostly known videos finish offline.
+- A per-video status line is appended to <out-dir>/status.jsonl.
+- With --db, timestamped segments are added to a searchable SQLite
+  database (segment_db.py) as each video finishes.
+
+Usage:
+    python batch.py videos.txt --workers 4 --out-dir transcripts
+    cat videos.txt | python batch.py - --lang en --min-interval 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import segment_db
+import transcriber
+from transcript_cache import TranscriptCache, DEFAULT_TTL_DAYS
+
+DEFAULT_WORKERS = 4
+DEFAULT_MIN_INTERVAL = 0.5
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 2.0
+
+# Library exceptions that will fail the same way on every retry: the video
+# has no usable captions ("no_transcript"), or cannot be fetched at all ("unavailable")
+NO_TRANSCRIPT_ERRORS = {"TranscriptsDisabled", "NoTranscriptFound"}
+PERMANENT_ERRORS = NO_TRANSCRIPT_ERRORS | {
+    "VideoUnavailable", "InvalidVideoId", "AgeRestricted", "VideoUnplayable",
+    "NotTranslatable", "TranslationLanguageNotAvailable",
+}
+
+class Pacer:
+    """Thread-safe minimum interval between fetch starts (shared by all workers)."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if self.min_interval <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def read_targets(path):
+    """URLs / IDs from `path` ("-" = stdin), normalized and deduplicated in order."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        lines = [line.strip() for line in f]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    seen = set()
+    video_ids = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        video_id = transcriber.extract_video_id(line)
+        if video_id not in seen:
+            seen.add(video_id)
+            video_ids.append(video_id)
+    return video_ids
+
+def is_permanent(error):
+    return type(error).__name__ in PERMANENT_ERRORS
+
+def error_text(error):
+    """Exception name + first line of its message (the library's messages span many lines)."""
+    lines = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {lines[0]}" if lines else type(error).__name__
+
+def transcribe_batch(video_ids, out_dir="transcripts", lang="ja", workers=DEFAULT_WORKERS,
+                     min_interval=DEFAULT_MIN_INTERVAL, retries=DEFAULT_RETRIES, make_api=transcriber.make_api,
+                     cache=None, db_path=None):
+    """
+    Fetch and save transcripts for `video_ids` into `out_dir`.
+    :param make_api: callable returning a new YouTubeTranscriptApi (one is created per thread).
+    :param cache: optional TranscriptCache; hits skip pacing and the network.
+    :param db_path: optional SQLite file to store timestamped segments in (segment_db.py).
+    Returns stats: {"videos", "ok", "no_transcript", "unavailable", "failed", "cached", "seconds",
+    "videos_per_second"}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    status_path = os.path.join(out_dir, "status.jsonl")
+    languages = transcriber.language_list(lang)
+    pacer = Pacer(min_interval)
+    local = threading.local()
+    status_lock = threading.Lock()
+
+    def fetch(video_id, record):
+        """Network fetch with pacing and retries. Returns segments or None."""
+        if getattr(local, "api", None) is None:
+            local.api = make_api()
+        for attempt in range(1, retries + 2):
+            record["attempts"] = attempt
+            pacer.wait()
+            try:
+                segments = transcriber.get_transcript(video_id, languages, api=local.api)
+            except Exception as e:
+                record["error"] = error_text(e)
+                if is_permanent(e):
+                    no_captions = type(e).__name__ in NO_TRANSCRIPT_ERRORS
+                    record["status"] = "no_transcript" if no_captions else "unavailable"
+                    return None
+                if attempt <= retries:
+                    # Fresh session for the retry; the old one may hold a broken connection
+                    local.api = make_api()
+                    time.sleep(BACKOFF_BASE ** (attempt - 1) * (1 + random.random()))
+                continue
+            if cache is not None:
+                cache.put(video_id, languages, segments)
+            return segments
+        return None
+
+    def work(video_id):
+        record = {"video_id": video_id, "status": "failed", "attempts": 0}
+        started = time.perf_counter()
+        segments = cache.get(video_id, languages) if cache is not None else None
+        if segments is not None:
+            record["cached"] = True
+        else:
+            segments = fetch(video_id, record)
+        if segments is not None:
+            transcriber.save_to_file(transcriber.segments_to_text(segments), video_id, out_dir, quiet=True)
+            record.update({"status": "ok", "segments": len(segments)})
+            record.pop("error", None)
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        with status_lock:
+            with open(status_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record, segments
+
+    counts = {"ok": 0, "no_transcript": 0, "unavailable": 0, "failed": 0}
+    if not video_ids:
+        return {"videos": 0, **counts, "cached": 0, "seconds": 0.0, "videos_per_second": 0.0}
+    cached = 0
+    conn = segment_db.connect(db_path) if db_path else None
+
+    workers = max(1, min(workers, len(video_ids)))
+    print(f"🚀 Fetching {len(video_ids)} videos with {workers} workers (min {min_interval}s between video fetches)...")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(work, video_id) for video_id in video_ids]
+            for done, future in enumerate(as_completed(futures), 1):
+                record, segments = future.result()
+                if conn is not None and segments is not None:
+                    # Single writer: inserts happen here in the main thread as videos finish
+                    segment_db.store_transcript(conn, record["video_id"], segments, languages)
+                counts[record["status"]] += 1
+                cached += record.get("cached", False)
+                if record["status"] != "ok":
+                    print(f"⚠️  {record['video_id']}: {record['status']} ({record.get('error')})")
+                if done % 10 == 0 or done == len(video_ids):
+                    elapsed = time.perf_counter() - started
+                    print(f"⏳ {done}/{len(video_ids)} ({done / elapsed:.2f} videos/s)")
+    finally:
+        # The cache writes its index only every few puts; persist the rest even if the run is interrupted
+        if cache is not None:
+            cache.save()
+
+    if conn is not None:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "videos": len(video_ids),
+        **counts,
+        "cached": cached,
+        "seconds": round(elapsed, 2),
+        "videos_per_second": round(len(video_ids) / elapsed, 2) if elapsed else 0.0,
+    }
+    print(f"✅ Done: {stats['ok']} saved ({cached} from cache), {stats['no_transcript']} without transcript, "
+          f"{stats['unavailable']} unavailable, {stats['failed']} failed ({stats['videos_per_second']} videos/s). Status: {status_path}")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch YouTube Transcriber")
+    parser.add_argument("input", help="File with one YouTube URL or ID per line ('-' for stdin)")
+    parser.add_argument("--lang", default="ja", help="Language code (default: ja)")
+    parser.add_argument("--out-dir", default="transcripts", help="Output directory (default: transcripts)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent fetches")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="Minimum seconds between video fetches (about 3 requests each) across all workers")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries per video on errors")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from YouTube")
+    parser.add_argument("--db", help="Also store timestamped segments in this SQLite search database")
+    parser.add_argument("--cache-ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help=f"Re-fetch cached transcripts older than this (default: {DEFAULT_TTL_DAYS})")
+    args = parser.parse_args()
+
+    ids = read_targets(args.input)
+    cache = None if args.no_cache else TranscriptCache(ttl_days=args.cache_ttl_days)
+    transcribe_batch(ids, args.out_dir, args.lang, args.workers, args.min_interval, args.retries, cache=cache,
+                     db_path=args.db)
@@ -0,0 +1,173 @@
+"""
+Transcriber Benchmark (offline)
+===============================
+Starts the local stand-in (stand_in.py) and fetches the same videos in
+three modes:
+
+    single  one `python transcriber.py ID` process per video, one after another
+    batch   batch.py's thread pool, cache disabled
+    cached  batch.py again with a warm transcript cache
+
+Reported per mode: videos/s, p50 / p95 per-video latency, peak memory
+(max RSS), failures and requests that reached the server. Single-shot
+latency includes interpreter start-up, which is what batch mode saves.
+
+Each measured run happens in a fresh interpreter so its peak memory is
+its own; the cache for the cached mode is filled by a separate, unreported
+run. Nothing outside a temporary directory is read or written.
+
+Usage:
+    python bench.py --videos 40 --workers 8 --latency 0.05
+    python bench.py --modes batch,cached --rate-429 0.05 --error-rate 0.02 --json bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import functools
+import subprocess
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import batch
+import stand_in
+import transcriber
+from transcript_cache import TranscriptCache
+
+MODES = ("single", "batch", "cached")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def bench_ids(count):
+    """Stand-in video IDs (11 characters, like real ones)."""
+    return [f"bench{k:06d}" for k in range(count)]
+
+def percentile(values, pct):
+    """Linearly interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+def peak_rss_mb(children=False):
+    """Peak RSS of this process (or of its largest finished child), None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run_mode(mode, video_ids, base_url, work_dir, lang="ja", workers=batch.DEFAULT_WORKERS, min_interval=0.0,
+             retries=batch.DEFAULT_RETRIES, cache_dir=None):
+    """
+    Fetch `video_ids` from the stand-in once ("single" or "batch"; batch uses
+    the cache in `cache_dir` if given). Meant to run in a fresh process.
+    Returns {"ok", "seconds", "latencies", "peak_rss_mb"}.
+    """
+    out_dir = tempfile.mkdtemp(prefix=f"{mode}-", dir=work_dir)
+    started = time.perf_counter()
+    if mode == "single":
+        env = dict(os.environ, **{transcriber.BASE_URL_ENV: base_url})
+        script = os.path.join(HERE, "transcriber.py")
+        latencies = []
+        for video_id in video_ids:
+            t = time.perf_counter()
+            subprocess.run([sys.executable, script, video_id, "--lang", lang, "--no-cache"],
+                           cwd=out_dir, env=env, capture_output=True)
+            latencies.append(time.perf_counter() - t)
+        seconds = time.perf_counter() - started
+        ok = sum(os.path.exists(os.path.join(out_dir, f"transcript_{v}.txt")) for v in video_ids)
+        return {"ok": ok, "seconds": seconds, "latencies": latencies, "peak_rss_mb": peak_rss_mb(children=True)}
+
+    cache = TranscriptCache(cache_dir) if cache_dir else None
+    stats = batch.transcribe_batch(video_ids, out_dir, lang, workers, min_interval, retries,
+                                   make_api=functools.partial(transcriber.make_api, base_url), cache=cache)
+    seconds = time.perf_counter() - started
+    with open(os.path.join(out_dir, "status.jsonl"), encoding="utf-8") as f:
+        latencies = [json.loads(line)["seconds"] for line in f]
+    return {"ok": stats["ok"], "seconds": seconds, "latencies": latencies, "peak_rss_mb": peak_rss_mb()}
+
+def in_fresh_process(func, *args, **kwargs):
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(func, *args, **kwargs).result()
+
+def bench(videos=40, modes=MODES, lang="ja", workers=batch.DEFAULT_WORKERS, min_interval=0.0,
+          retries=batch.DEFAULT_RETRIES, **server_options):
+    """Run each mode against a fresh stand-in. Returns one row per mode."""
+    video_ids = bench_ids(videos)
+    server, base_url = stand_in.serve(**server_options)
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            options = dict(lang=lang, workers=workers, min_interval=min_interval, retries=retries)
+            for mode in modes:
+                cache_dir = os.path.join(work_dir, "cache") if mode == "cached" else None
+                if cache_dir:
+                    print("🔥 Warming the transcript cache...")
+                    in_fresh_process(run_mode, "batch", video_ids, base_url, work_dir, cache_dir=cache_dir, **options)
+                print(f"⏱️  {mode}: {videos} videos")
+                before = dict(server.counts)
+                result = in_fresh_process(run_mode, "single" if mode == "single" else "batch", video_ids,
+                                          base_url, work_dir, cache_dir=cache_dir, **options)
+                latencies = result["latencies"]
+                rows.append({
+                    "mode": mode,
+                    "videos": videos,
+                    "ok": result["ok"],
+                    "failed": videos - result["ok"],
+                    "seconds": round(result["seconds"], 2),
+                    "videos_per_second": round(videos / result["seconds"], 2),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+                    "peak_rss_mb": result["peak_rss_mb"],
+                    "requests": server.counts["requests"] - before["requests"],
+                    "throttled": server.counts["429"] - before["429"],
+                    "errors": server.counts["500"] - before["500"],
+                })
+    finally:
+        server.shutdown()
+    return rows
+
+def print_rows(rows, server_options):
+    print(f"--- Transcriber Benchmark (stand-in: {json.dumps(server_options)}) ---")
+    print(f"{'mode':<8} {'videos/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'peak MB':>8} {'failed':>7} {'requests':>9}")
+    for row in rows:
+        peak = "n/a" if row["peak_rss_mb"] is None else row["peak_rss_mb"]
+        print(f"{row['mode']:<8} {row['videos_per_second']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} {peak:>8} "
+              f"{row['failed']:>7} {row['requests']:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for the transcriber")
+    parser.add_argument("--videos", type=int, default=40, help="Videos per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--lang", default="ja")
+    parser.add_argument("--workers", type=int, default=batch.DEFAULT_WORKERS, help="Batch-mode workers")
+    parser.add_argument("--min-interval", type=float, default=0.0,
+                        help="Batch-mode pacing between video fetches (default: 0, unpaced)")
+    parser.add_argument("--retries", type=int, default=batch.DEFAULT_RETRIES)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Stand-in random +/- seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in share of 500 responses")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Stand-in share of 429 responses")
+    parser.add_argument("--segments", type=int, default=stand_in.DEFAULT_SEGMENTS, help="Caption lines per track")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    server_options = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          rate_429=args.rate_429, segments=args.segments)
+    rows = bench(args.videos, modes, args.lang, args.workers, args.min_interval, args.retries, **server_options)
+    print_rows(rows, server_options)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
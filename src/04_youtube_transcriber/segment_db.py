@@ -0,0 +1,154 @@
+"""
+Transcript segment database (SQLite + FTS5).
+============================================
+Stores every transcript segment (video_id, start, duration, text) with a
+full-text index, so a phrase can be found across thousands of videos in
+milliseconds and opened at the exact moment it is said.
+
+The FTS5 index uses the trigram tokenizer, which matches any substring and
+therefore works for Japanese (no word boundaries) as well as English.
+Queries shorter than three characters cannot use trigrams and fall back to
+a LIKE scan.
+
+Results come newest-first by default, which stops at the first `limit`
+matches and stays in the millisecond range even for very common phrases.
+--rank orders by BM25 relevance instead, which has to score every match.
+
+Re-storing a video replaces its segments, so fetching it again never
+produces duplicates.
+
+Usage:
+    python transcriber.py VIDEO_URL --db transcripts.db
+    python batch.py videos.txt --db transcripts.db
+    python segment_db.py transcripts.db search "業務効率化" --limit 20
+    python segment_db.py transcripts.db --stats
+"""
+
+import json
+import time
+import sqlite3
+import argparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id   TEXT PRIMARY KEY,
+    languages  TEXT,
+    segments   INTEGER NOT NULL,
+    stored_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id        INTEGER PRIMARY KEY,
+    video_id  TEXT NOT NULL,
+    start     REAL NOT NULL,
+    duration  REAL NOT NULL,
+    text      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_video ON segments(video_id, start);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+MIN_FTS_QUERY = 3  # trigram tokenizer needs at least 3 characters
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def store_transcript(conn, video_id, segments, languages=None):
+    """Insert (or replace) all segments of one video in a single transaction."""
+    with conn:
+        conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+        conn.executemany(
+            "INSERT INTO segments (video_id, start, duration, text) VALUES (?, ?, ?, ?)",
+            [(video_id, s["start"], s["duration"], s["text"]) for s in segments],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO videos (video_id, languages, segments, stored_at) VALUES (?, ?, ?, ?)",
+            (video_id, json.dumps(list(languages or [])), len(segments), time.time()),
+        )
+
+def watch_link(video_id, start):
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s"
+
+def _fts_phrase(query):
+    """Quote the query as one FTS5 phrase so punctuation is not parsed as syntax."""
+    return '"' + query.replace('"', '""') + '"'
+
+def search(conn, query, limit=20, video_id=None, rank=False):
+    """
+    Segments matching `query` (a substring / phrase), most recently stored
+    first, or by relevance with `rank=True`.
+    Returns dicts: {"video_id", "start", "duration", "text", "link"}.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    params = []
+    where = ""
+    if video_id:
+        where = " AND s.video_id = ?"
+        params.append(video_id)
+
+    if len(query) >= MIN_FTS_QUERY:
+        sql = ("SELECT s.video_id, s.start, s.duration, s.text FROM segments_fts f "
+               "JOIN segments s ON s.id = f.rowid "
+               f"WHERE segments_fts MATCH ?{where} "
+               f"ORDER BY {'bm25(segments_fts)' if rank else 'f.rowid DESC'} LIMIT ?")
+        rows = conn.execute(sql, [_fts_phrase(query)] + params + [limit]).fetchall()
+    else:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        sql = ("SELECT s.video_id, s.start, s.duration, s.text FROM segments s "
+               f"WHERE s.text LIKE ? ESCAPE '\\'{where} ORDER BY s.id DESC LIMIT ?")
+        rows = conn.execute(sql, [f"%{escaped}%"] + params + [limit]).fetchall()
+
+    return [{**dict(row), "link": watch_link(row["video_id"], row["start"])} for row in rows]
+
+def stats(conn):
+    videos = conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+    segments = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+    return {"videos": videos, "segments": segments}
+
+def format_time(seconds):
+    seconds = int(seconds)
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcript segment database")
+    parser.add_argument("db", help="SQLite database file")
+    parser.add_argument("--stats", action="store_true", help="Show video and segment counts")
+    sub = parser.add_subparsers(dest="command")
+    q = sub.add_parser("search", help="Find segments containing a phrase")
+    q.add_argument("query")
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--video", help="Only search this video ID")
+    q.add_argument("--rank", action="store_true", help="Order by relevance (slower for common phrases)")
+    q.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == "search":
+        started = time.perf_counter()
+        results = search(conn, args.query, args.limit, args.video, args.rank)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            for r in results:
+                print(f"[{format_time(r['start'])}] {r['text']}")
+                print(f"    {r['link']}")
+            print(f"🔎 {len(results)} result(s) in {elapsed_ms:.1f} ms")
+    else:
+        print(json.dumps(stats(conn), indent=2))
@@ -0,0 +1,166 @@
+"""
+Local YouTube stand-in
+======================
+A small HTTP server that answers the three requests youtube_transcript_api
+makes per video (watch page, innertube player, timedtext), with canned
+caption tracks. Point the transcriber at it with YOUTUBE_BASE_URL to
+load-test fetching, batching and caching without touching YouTube.
+
+- Every video has a Japanese (auto-generated) and an English track with
+  --segments lines each. Video IDs starting with "NoCaps" have captions
+  disabled (TranscriptsDisabled).
+- --latency / --jitter: seconds added to every response.
+- --rate-429: share of requests answered with 429 Too Many Requests
+  (the library raises IpBlocked).
+- --error-rate: share of requests answered with 500 (YouTubeRequestFailed).
+
+Usage:
+    python stand_in.py --port 8765 --latency 0.1 --rate-429 0.05
+    YOUTUBE_BASE_URL=http://127.0.0.1:8765 python batch.py videos.txt --no-cache
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+API_KEY = "standin-innertube-key"
+DEFAULT_SEGMENTS = 120
+NO_CAPTIONS_PREFIX = "NoCaps"
+
+LINES = {
+    "ja": ["本日は業務効率化についてお話しします", "まずは現状の課題を整理しましょう",
+           "自動化できる作業は意外と多いです", "ポイントは小さく始めることです"],
+    "en": ["Today we talk about business automation", "First, let's look at the current problems",
+           "More tasks can be automated than you think", "The key is to start small"],
+}
+
+def canned_segments(video_id, lang, count=DEFAULT_SEGMENTS):
+    """Deterministic segments for one track: [{"text", "start", "duration"}, ...]."""
+    lines = LINES[lang]
+    return [{"text": f"{lines[k % len(lines)]} ({video_id} #{k + 1})", "start": k * 5.0, "duration": 4.5}
+            for k in range(count)]
+
+def timedtext_xml(segments):
+    body = "".join(f'<text start="{s["start"]}" dur="{s["duration"]}">{escape(s["text"])}</text>'
+                   for s in segments)
+    return f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>'
+
+def player_json(video_id):
+    """Innertube player response with one caption track per canned language."""
+    if video_id.startswith(NO_CAPTIONS_PREFIX):
+        return {"playabilityStatus": {"status": "OK"}}
+    tracks = [
+        {"baseUrl": f"https://www.youtube.com/api/timedtext?v={video_id}&lang=ja&fmt=srv3",
+         "name": {"runs": [{"text": "Japanese (auto-generated)"}]}, "languageCode": "ja", "kind": "asr"},
+        {"baseUrl": f"https://www.youtube.com/api/timedtext?v={video_id}&lang=en&fmt=srv3",
+         "name": {"runs": [{"text": "English"}]}, "languageCode": "en"},
+    ]
+    return {"playabilityStatus": {"status": "OK"},
+            "captions": {"playerCaptionsTracklistRenderer": {"captionTracks": tracks, "translationLanguages": []}}}
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _injected_failure(self):
+        """Sleep for the configured latency, then maybe answer 429 / 500. True if a failure was sent."""
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        roll = random.random()
+        with server.lock:
+            server.counts["requests"] += 1
+            if roll < server.rate_429:
+                server.counts["429"] += 1
+                status = 429
+            elif roll < server.rate_429 + server.error_rate:
+                server.counts["500"] += 1
+                status = 500
+            else:
+                return False
+        self._send(status, "stand-in injected error", "text/plain")
+        return True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if self._injected_failure():
+            return
+        video_id = query.get("v", [""])[0]
+        if url.path == "/watch":
+            html = (f"<html><head><title>{escape(video_id)}</title></head><body>"
+                    f'<script>ytcfg.set({{"INNERTUBE_API_KEY": {json.dumps(API_KEY)}}});</script></body></html>')
+            self._send(200, html, "text/html; charset=utf-8")
+        elif url.path == "/api/timedtext" and query.get("lang", [""])[0] in LINES:
+            segments = canned_segments(video_id, query["lang"][0], self.server.segments)
+            self._send(200, timedtext_xml(segments), "text/xml; charset=utf-8")
+        else:
+            self._send(404, "not found", "text/plain")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self._injected_failure():
+            return
+        if urlsplit(self.path).path != "/youtubei/v1/player":
+            self._send(404, "not found", "text/plain")
+            return
+        video_id = json.loads(body or b"{}").get("videoId", "")
+        self._send(200, json.dumps(player_json(video_id)), "application/json")
+
+class StandInServer(ThreadingHTTPServer):
+    request_queue_size = 128  # many concurrent workers connect at once
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0, rate_429=0.0, segments=DEFAULT_SEGMENTS):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.segments = segments
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "429": 0, "500": 0}
+
+def serve(port=0, **options):
+    """Start a stand-in on localhost in a background thread. Returns (server, base_url)."""
+    server = StandInServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local YouTube stand-in for offline load tests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds on top of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--segments", type=int, default=DEFAULT_SEGMENTS, help="Caption lines per track")
+    args = parser.parse_args()
+
+    server, base_url = serve(args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             rate_429=args.rate_429, segments=args.segments)
+    print(f"🧪 Stand-in listening on {base_url}")
+    print(f"   export YOUTUBE_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n📊 {json.dumps(server.counts)}")
@@ -2,15 +2,30 @@
 YouTube Transcriber
 ===================
 Extracts subtitles/transcripts from YouTube videos using video ID or URL.
-(Wraps youtube_transcript_api CLI for stability)
+
+Transcripts are fetched in-process with YouTubeTranscriptApi().fetch() and
+returned as timestamped segments. The youtube_transcript_api CLI is only
+used as a fallback when the library cannot be imported in this interpreter
+(e.g. it was installed with pipx).
+
+Fetched segments are cached on disk (see transcript_cache.py), so running
+it again on the same video needs no network.
+
+Set YOUTUBE_BASE_URL to fetch from another server, such as the local
+stand-in used for offline benchmarks (stand_in.py, bench.py).
 """
 
 import argparse
+import json
 import os
 import re
 import subprocess
 import sys
 
+from transcript_cache import TranscriptCache, DEFAULT_TTL_DAYS
+
+BASE_URL_ENV = "YOUTUBE_BASE_URL"
+
 def extract_video_id(url_or_id):
     """
     Extracts video ID from a typical YouTube URL or returns the ID if it looks like one.
@@ -25,49 +40,134 @@ def extract_video_id(url_or_id):
             return match.group(1)
     return url_or_id
 
-def get_transcript_cli(video_id, lang='ja'):
-    """Fetch transcript using the CLI wrapper."""
+def language_list(lang='ja'):
+    """Requested language first, then English."""
+    return [lang] if lang == "en" else [lang, "en"]
+
+def redirect_session(base_url):
+    """requests.Session that sends every www.youtube.com request to `base_url` instead."""
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+
+    class RedirectAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            request.url = base_url.rstrip("/") + request.path_url
+            return super().send(request, **kwargs)
+
+    session = Session()
+    session.mount("https://www.youtube.com", RedirectAdapter())
+    return session
+
+def make_api(base_url=None):
+    """
+    New YouTubeTranscriptApi instance. Not thread-safe (it owns a
+    requests.Session): create one per thread.
+    With `base_url` (or YOUTUBE_BASE_URL), requests go to that server
+    instead of YouTube, e.g. the local stand-in (stand_in.py).
+    """
+    from youtube_transcript_api import YouTubeTranscriptApi
+    base_url = base_url or os.environ.get(BASE_URL_ENV)
+    if base_url:
+        return YouTubeTranscriptApi(http_client=redirect_session(base_url))
+    return YouTubeTranscriptApi()
+
+def get_transcript(video_id, languages=("ja", "en"), api=None, cache=None):
+    """
+    Fetch a transcript in-process (or from `cache`, a TranscriptCache, if given).
+    Returns a list of segments: [{"text": str, "start": float, "duration": float}, ...]
+    Raises the library's exceptions (e.g. TranscriptsDisabled, NoTranscriptFound).
+    """
+    if cache is not None:
+        segments = cache.get(video_id, languages)
+        if segments is not None:
+            return segments
+    api = api or make_api()
+    fetched = api.fetch(video_id, languages=list(languages))
+    segments = [{"text": s.text, "start": s.start, "duration": s.duration} for s in fetched]
+    if cache is not None:
+        cache.put(video_id, languages, segments)
+    return segments
+
+def segments_to_text(segments):
+    """Plain text, one segment per line (same as the CLI's --format text)."""
+    return "\n".join(segment["text"] for segment in segments)
+
+def fetch_segments(video_id, lang='ja', cache=None):
+    """Transcript segments: cache, in-process, or via the CLI. None on failure."""
+    try:
+        return get_transcript(video_id, language_list(lang), cache=cache)
+    except ImportError:
+        print("⚠️  youtube_transcript_api is not importable here. Falling back to the CLI...")
+    except Exception as e:
+        print(f"❌ Error fetching transcript: {e}")
+        return None
+
+    output = get_transcript_cli(video_id, lang, fmt="json")
+    if output is None:
+        return None
+    try:
+        data = json.loads(output)
+        # The JSON formatter writes one list of segments per requested video
+        segments = data[0] if data and isinstance(data[0], list) else data
+        segments = [{"text": s["text"], "start": s["start"], "duration": s["duration"]} for s in segments]
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        print(f"❌ Unexpected CLI output: {e}")
+        return None
+    if cache is not None:
+        cache.put(video_id, language_list(lang), segments)
+    return segments
+
+def fetch_text(video_id, lang='ja', cache=None):
+    """Transcript as plain text. None on failure."""
+    segments = fetch_segments(video_id, lang, cache)
+    return None if segments is None else segments_to_text(segments)
+
+def get_transcript_cli(video_id, lang='ja', fmt="text"):
+    """Fetch transcript using the CLI wrapper (fallback, starts a second interpreter)."""
     try:
         # Construct command: youtube_transcript_api [id] --languages [lang] --format text
         cmd = [
             "youtube_transcript_api",
             video_id,
-            "--languages", lang, "en", # Try requested language, then English
-            "--format", "text"
+            "--languages", *language_list(lang), # Try requested language, then English
+            "--format", fmt
         ]
-        
-        # Run command without text=True to capture bytes
-        process = subprocess.run(cmd, capture_output=True)
-        
+
+        # Force UTF-8 output so nothing depends on the console code page (e.g. cp932)
+        env = dict(os.environ, PYTHONIOENCODING="utf-8", PYTHONUTF8="1")
+        process = subprocess.run(cmd, capture_output=True, env=env)
+
         if process.returncode != 0:
-            # Try decoding stderr for error message
-            try:
-                err = process.stderr.decode('utf-8')
-            except:
-                err = process.stderr.decode('cp932', errors='ignore')
-            raise Exception(err)
-            
-        # Try decoding stdout
-        try:
-            return process.stdout.decode('utf-8')
-        except UnicodeDecodeError:
-            return process.stdout.decode('cp932', errors='ignore')
-        
+            raise Exception(process.stderr.decode('utf-8', errors='replace'))
+
+        return process.stdout.decode('utf-8', errors='replace')
+
+    except FileNotFoundError:
+        print("❌ Error: 'youtube_transcript_api' command not found. Please install dependencies.")
+        return None
     except Exception as e:
         print(f"❌ Error fetching transcript: {e}")
         return None
 
-def save_to_file(text, video_id):
+def save_to_file(text, video_id, out_dir=".", quiet=False):
     filename = f"transcript_{video_id}.txt"
+    if out_dir != ".":
+        filename = os.path.join(out_dir, filename)
     with open(filename, "w", encoding="utf-8") as f:
         f.write(text)
-    print(f"✅ Saved to: {filename}")
+    if not quiet:
+        print(f"✅ Saved to: {filename}")
+    return filename
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="YouTube Transcriber")
     parser.add_argument("target", nargs="?", help="YouTube Video URL or ID")
     parser.add_argument("--lang", default="ja", help="Language code (default: ja)")
-    
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from YouTube")
+    parser.add_argument("--cache-ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help=f"Re-fetch cached transcripts older than this (default: {DEFAULT_TTL_DAYS})")
+    parser.add_argument("--db", help="Also store timestamped segments in this SQLite search database")
+
     args = parser.parse_args()
     
     target = args.target
@@ -83,17 +183,20 @@ if __name__ == "__main__":
     print(f"🎬 Target Video ID: {vid}")
     print(f"⏳ Fetching subtitles...")
     
-    # Check if youtube_transcript_api is installed
-    try:
-        subprocess.run(["youtube_transcript_api", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except FileNotFoundError:
-        print("❌ Error: 'youtube_transcript_api' command not found. Please install dependencies.")
-        sys.exit(1)
+    cache = None if args.no_cache else TranscriptCache(ttl_days=args.cache_ttl_days)
+    segments = fetch_segments(vid, args.lang, cache)
+    if cache is not None:
+        cache.save()
+    text = segments_to_text(segments) if segments else None
 
-    text = get_transcript_cli(vid, args.lang)
-    
     if text:
         save_to_file(text, vid)
+        if args.db:
+            import segment_db
+            conn = segment_db.connect(args.db)
+            segment_db.store_transcript(conn, vid, segments, language_list(args.lang))
+            conn.close()
+            print(f"🗄️  Stored {len(segments)} segments in {args.db}")
         print("--- Preview ---")
         preview_lines = text.strip().split("\n")[:3]
         for line in preview_lines:
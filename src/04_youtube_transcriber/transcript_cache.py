@@ -0,0 +1,235 @@
+"""
+Transcript Cache
+================
+On-disk cache of fetched transcripts, keyed on (video_id, language list).
+
+Segments are stored gzip-compressed, one file per entry. An index file
+(index.json) holds every entry's size and timestamps, so lookups and
+eviction never scan the directory. The directory is listed once on start-up
+to pick up entries a killed or concurrent run wrote but never indexed, and
+the on-disk index is merged in before it is rewritten.
+
+- TTL: entries older than --cache-ttl-days are treated as misses.
+- Size bound: least recently used entries are evicted once the cache
+  grows past max_mb.
+
+Usage:
+    from transcript_cache import TranscriptCache
+    cache = TranscriptCache()
+    segments = cache.get("dQw4w9WgXcQ", ["ja", "en"])
+
+    python transcript_cache.py --stats
+    python transcript_cache.py --clear
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+CACHE_DIR = os.environ.get(
+    "TRANSCRIPT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "awesome-business-automation", "transcripts"),
+)
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 500
+SAVE_EVERY = 50  # puts between index writes
+ENTRY_SUFFIX = ".json.gz"
+
+def cache_key(video_id, languages):
+    """Entry key: video ID + a short hash of the ordered language preference list."""
+    langs = ",".join(languages)
+    return f"{video_id}.{hashlib.sha1(langs.encode('utf-8')).hexdigest()[:10]}"
+
+class TranscriptCache:
+    """Thread-safe transcript cache. Call save() when done to persist the index."""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl_days=DEFAULT_TTL_DAYS, max_mb=DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_bytes = max_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.removed = set()  # keys this instance deleted, not to be merged back in
+        self.index = self._read_index()
+        self._recover()
+        self.total = sum(entry["size"] for entry in self.index.values())
+        self.unsaved_puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{ENTRY_SUFFIX}")
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _recover(self):
+        """
+        Match the index to the entry files: index files it does not know
+        (written before a crash, or by another process) and drop entries
+        whose file is gone.
+        """
+        try:
+            files = {e.name[:-len(ENTRY_SUFFIX)]: e.stat() for e in os.scandir(self.cache_dir)
+                     if e.name.endswith(ENTRY_SUFFIX)}
+        except OSError:
+            files = {}
+        for key in set(self.index) - set(files):
+            del self.index[key]
+            self.dirty = True
+        for key in set(files) - set(self.index):
+            st = files[key]
+            self.index[key] = {
+                "video_id": key.rsplit(".", 1)[0],
+                "languages": [],  # unknown; only the key is needed for lookups
+                "size": st.st_size,
+                "fetched_at": st.st_mtime,
+                "last_used": st.st_mtime,
+            }
+            self.dirty = True
+
+    def get(self, video_id, languages):
+        """Cached segments, or None if missing or expired."""
+        key = cache_key(video_id, languages)
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None or (self.ttl and time.time() - entry["fetched_at"] > self.ttl):
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self.dirty = True
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            # File lost or corrupt: forget the entry
+            with self.lock:
+                lost = self.index.pop(key, None)
+                if lost is not None:
+                    self.total -= lost["size"]
+                    self.removed.add(key)
+                    self.dirty = True
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return segments
+
+    def put(self, video_id, languages, segments):
+        """
+        Store segments and evict down to the size limit. The index is written
+        every SAVE_EVERY puts (and by save()), not on every put.
+        """
+        key = cache_key(video_id, languages)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(segments, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self.lock:
+            old = self.index.get(key)
+            if old is not None:
+                self.total -= old["size"]
+            self.removed.discard(key)
+            self.index[key] = {
+                "video_id": video_id,
+                "languages": list(languages),
+                "size": os.path.getsize(path),
+                "fetched_at": now,
+                "last_used": now,
+            }
+            self.total += self.index[key]["size"]
+            self._evict()
+            self.dirty = True
+            self.unsaved_puts += 1
+            if self.unsaved_puts >= SAVE_EVERY:
+                self._save()
+
+    def _evict(self):
+        if self.total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used"]):
+            if self.total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self.total -= entry["size"]
+            del self.index[key]
+            self.removed.add(key)
+
+    def _merge(self):
+        """Take in entries another process indexed since this one loaded the index."""
+        for key, entry in self._read_index().items():
+            if key not in self.index and key not in self.removed and os.path.exists(self._path(key)):
+                self.index[key] = entry
+                self.total += entry["size"]
+        self._evict()
+
+    def _save(self):
+        if not self.dirty:
+            return
+        self._merge()
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        self.unsaved_puts = 0
+
+    def save(self):
+        """Persist the index (new entries and last-used times of hits)."""
+        with self.lock:
+            if self.dirty:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._save()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "dir": self.cache_dir,
+                "entries": len(self.index),
+                "size_mb": round(self.total / (1024 * 1024), 2),
+                "max_mb": round(self.max_bytes / (1024 * 1024)),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self.removed.update(self.index)
+            self.index = {}
+            self.total = 0
+            self.dirty = True
+            if os.path.isdir(self.cache_dir):
+                self._save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcript cache")
+    parser.add_argument("--stats", action="store_true", help="Show entry count and size")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached transcript")
+    args = parser.parse_args()
+
+    cache = TranscriptCache()
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Cleared {cache.cache_dir}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,241 @@
+"""
+Driver Factory
+==============
+Shared Chrome driver setup for the Selenium based tools
+(01_google_maps_leads, 03_instagram_auto_like).
+
+The chromedriver binary is resolved once with webdriver-manager and the
+path/version is cached on disk. On later launches the cached driver is
+checked against the installed Chrome version locally (no network), so
+startup is fast and works offline.
+
+Usage:
+    from utils.driver_factory import create_chrome_driver
+    driver = create_chrome_driver(headless=True, extra_args=["--lang=ja-JP"])
+    print(driver.startup_timings)   # {'resolve': 0.01, 'options': 0.0, 'launch': 1.8}
+
+    # Lean profile: no images / fonts / media, new headless mode
+    driver = create_chrome_driver(headless=True, lean=True)
+
+    # Show cached driver info / Chrome version
+    python utils/driver_factory.py --info
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import subprocess
+
+CACHE_DIR = os.environ.get(
+    "DRIVER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "awesome-business-automation"),
+)
+CACHE_FILE = os.path.join(CACHE_DIR, "chromedriver.json")
+
+# Options shared by all tools (stability + basic anti-detection)
+COMMON_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+]
+
+# Lean profile: resources blocked via CDP Network.setBlockedURLs
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "fonts.gstatic.com/*", "fonts.googleapis.com/*",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+LEAN_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+]
+
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+def _run_version(cmd):
+    """Run `<binary> --version` and return the parsed version string or None."""
+    try:
+        out = subprocess.run(cmd, capture_output=True, timeout=10).stdout.decode("utf-8", errors="ignore")
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(out)
+    return match.group(0) if match else None
+
+def get_chrome_version():
+    """
+    Detect the installed Chrome version without network access.
+    Returns a version string like '120.0.6099.109' or None.
+    """
+    if sys.platform.startswith("win"):
+        try:
+            import winreg
+            for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+
+    candidates = []
+    if sys.platform == "darwin":
+        candidates.append("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome")
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            candidates.append(path)
+
+    for binary in candidates:
+        if os.path.exists(binary):
+            version = _run_version([binary, "--version"])
+            if version:
+                return version
+    return None
+
+def get_driver_version(driver_path):
+    """Return the version of a chromedriver binary or None."""
+    if not driver_path or not os.path.exists(driver_path):
+        return None
+    return _run_version([driver_path, "--version"])
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+def resolve_chromedriver(force=False):
+    """
+    Return a chromedriver path matching the installed Chrome.
+
+    1. Use the cached path if the binary exists and its major version
+       matches the local Chrome (checked offline). If either version is
+       unknown, the cached binary is trusted.
+    2. Otherwise download/resolve with webdriver-manager and update the cache.
+    3. If that fails (e.g. no network), fall back to the cached binary, or
+       None to let Selenium Manager try on its own.
+    """
+    cache = load_cache()
+    chrome_version = get_chrome_version()
+    cached_path = cache.get("path")
+
+    if not force and cached_path and os.path.exists(cached_path):
+        cached_version = cache.get("driver_version")
+        if cached_version is None:
+            # Not parsed when it was cached: probe again and remember it if it works now
+            cached_version = get_driver_version(cached_path)
+            if cached_version:
+                save_cache(dict(cache, driver_version=cached_version))
+        # An unknown version on either side is no reason to go online on every launch
+        if chrome_version is None or cached_version is None or _major(cached_version) == _major(chrome_version):
+            return cached_path
+        logging.info(f"Cached chromedriver {cached_version} does not match Chrome {chrome_version}. Re-resolving...")
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
+    except Exception as e:
+        if cached_path and os.path.exists(cached_path):
+            logging.warning(f"Could not resolve chromedriver ({e}). Using cached {cached_path}")
+            return cached_path
+        logging.warning(f"Could not resolve chromedriver ({e}). Falling back to Selenium Manager.")
+        return None
+
+    save_cache({
+        "path": driver_path,
+        "driver_version": get_driver_version(driver_path),
+        "chrome_version": chrome_version,
+        "resolved_at": int(time.time()),
+    })
+    return driver_path
+
+def create_chrome_driver(headless=False, extra_args=None, experimental_options=None, lean=False,
+                         blocked_urls=None):
+    """
+    Create a Chrome WebDriver using the cached chromedriver.
+    :param headless: If True, run in headless mode (no GUI).
+    :param extra_args: Additional Chrome command line arguments.
+    :param experimental_options: Additional dict of experimental options.
+    :param lean: If True, block images, fonts and media (Chrome prefs + CDP
+                 Network.setBlockedURLs) and use the new headless mode.
+    :param blocked_urls: Extra URL patterns to block in lean mode (e.g. map tiles).
+
+    The returned driver has a `startup_timings` dict with the seconds spent
+    per phase (resolve / options / launch), also logged at INFO level.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    timings = {}
+
+    t0 = time.perf_counter()
+    driver_path = resolve_chromedriver()
+    timings["resolve"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new" if lean else "--headless")
+    for arg in COMMON_ARGS + (LEAN_ARGS if lean else []) + list(extra_args or []):
+        options.add_argument(arg)
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    experimental_options = dict(experimental_options or {})
+    if lean:
+        experimental_options["prefs"] = {**LEAN_PREFS, **experimental_options.get("prefs", {})}
+    for key, value in experimental_options.items():
+        options.add_experimental_option(key, value)
+    timings["options"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    service = Service(driver_path) if driver_path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    timings["launch"] = time.perf_counter() - t0
+
+    if lean:
+        t0 = time.perf_counter()
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS + list(blocked_urls or [])})
+        timings["lean_setup"] = time.perf_counter() - t0
+
+    driver.startup_timings = timings
+    logging.info("Driver startup: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    return driver
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Chrome driver cache")
+    parser.add_argument("--info", action="store_true", help="Show cached driver and local Chrome version")
+    parser.add_argument("--refresh", action="store_true", help="Re-resolve chromedriver (needs network)")
+    args = parser.parse_args()
+
+    if args.refresh:
+        print(f"Resolved: {resolve_chromedriver(force=True)}")
+    else:
+        print(f"Cache file:     {CACHE_FILE}")
+        print(f"Chrome version: {get_chrome_version()}")
+        print(json.dumps(load_cache(), indent=2))